@@ -7,7 +7,7 @@ from alembic import context
 
 # CUSTOM: Import SQLModel and your models
 from sqlmodel import SQLModel
-from app.models import user # Import all models here so they are registered
+from app.models import user, item # Import all models here so they are registered
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
@@ -1,14 +1,36 @@
 
-from typing import Generator, Optional
+import hashlib
+import time
+from typing import AsyncGenerator, Generator, Optional
 from fastapi import Depends, HTTPException, status, Request
 from jose import jwt, JWTError
 from pydantic import ValidationError
+import redis.asyncio as redis
 
 from app.core.config import settings
 from app.core import security
 from app.schemas import user as user_schema
 from app.schemas import token as token_schema
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.core.cache import TTLCache
+from app.core.cache_invalidation import cache_invalidator
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Authenticated principals keyed by token subject (user id or email);
+# invalidated across workers through cache_invalidator
+principal_cache = cache_invalidator.register(TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    name="principal",
+))
+
+# Verified token payloads keyed by a digest of the raw JWT
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    name="token",
+)
 
 def get_db() -> Generator:
    
@@ -18,7 +40,21 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_token_from_cookie(request: Request) -> str:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_redis(request: Request) -> redis.Redis:
+    """
+    The process-wide pooled Redis client created in the app lifespan.
+    """
+    return request.app.state.redis
+
+# Plain `def` dependencies are run in the threadpool; the ones below never block,
+# so they are `async def` to keep authenticated requests on the event loop.
+
+async def get_token_from_cookie(request: Request) -> str:
    
     token = request.cookies.get("access_token")
     if not token:
@@ -28,14 +64,19 @@ def get_token_from_cookie(request: Request) -> str:
         )
     return token
 
-from sqlmodel import Session, select
 from app.models.user import User
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(get_token_from_cookie)
-) -> user_schema.User:
-   
+def decode_token(token: str) -> token_schema.TokenPayload:
+    """
+    Verifies a JWT and returns its payload.
+    Successful results are memoized until the token expires, so repeat
+    requests with the same cookie skip the signature check and validation.
+    """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(cache_key)
+    if token_data is not None:
+        return token_data
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -46,24 +87,50 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+    if token_data.exp is not None:
+        token_cache.set(cache_key, token_data, ttl=token_data.exp - time.time())
+    return token_data
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(get_token_from_cookie)
+) -> user_schema.User:
+   
+    token_data = decode_token(token)
     
+    if token_data.sub:
+        cached_user = principal_cache.get(token_data.sub)
+        if cached_user is not None:
+            return cached_user
+
     user = None
     if token_data.sub:
         if token_data.sub.isdigit():
-             user = db.get(User, int(token_data.sub))
+             user = await db.get(User, int(token_data.sub))
         
         if not user:
 
              statement = select(User).where(User.email == token_data.sub)
-             results = db.exec(statement)
+             results = await db.exec(statement)
              user = results.first()
         
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-        
-    return user 
 
-def get_current_active_user(
+    # Cache a detached snapshot so it can be shared safely across sessions
+    principal = user_schema.User.model_validate(user)
+    principal_cache.set(token_data.sub, principal)
+    return principal
+
+async def invalidate_principal(user: User) -> None:
+    """
+    Drops a user from the principal cache of every API worker.
+    Call this after any write that changes the user (profile update, deactivation).
+    """
+    await cache_invalidator.invalidate("principal", str(user.id), user.email)
+
+async def get_current_active_user(
     current_user: user_schema.User = Depends(get_current_user),
 ) -> user_schema.User:
   
@@ -71,7 +138,7 @@ def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_active_superuser(
+async def get_current_active_superuser(
     current_user: user_schema.User = Depends(get_current_active_user),
 ) -> user_schema.User:
     
@@ -1,37 +1,47 @@
 
 from datetime import timedelta
 from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
 from app.core import security
 from app.core.config import settings
+from app.core.rate_limit import account_limit, ip_limit, rate_limiter
 from app.api import deps
 from app.schemas import user as user_schema
-from app.db.session import SessionLocal
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.user import User
 
 router = APIRouter()
 
 @router.post("/login/access-token")
-def login_access_token(
+async def login_access_token(
+    request: Request,
     response: Response,
     user_in: user_schema.UserLogin,
-    db: Session = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> Any:
     """
     Login endpoint that sets an HttpOnly cookie with the JWT.
     Accepts JSON body: { "email": "...", "password": "..." }
     """
-    
+
+    # Throttled per client IP and per target account (one atomic check) before
+    # any argon2 work; the account bucket stops distributed guessing
+    await rate_limiter.hit(
+        ip_limit("login", request, settings.RATE_LIMIT_LOGIN_PER_IP),
+        account_limit("login", user_in.email, settings.RATE_LIMIT_LOGIN_PER_ACCOUNT),
+    )
+
     # Authenticate User
     statement = select(User).where(User.email == user_in.email)
-    user = db.exec(statement).first()
+    user = (await db.exec(statement)).first()
 
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     
-    if not security.verify_password(user_in.password, user.hashed_password):
+    # argon2 runs on the dedicated hash pool, not the request threadpool
+    if not await security.verify_password_async(user_in.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     
     # Check if user is active
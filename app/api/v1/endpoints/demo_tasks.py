@@ -1,10 +1,23 @@
-from fastapi import APIRouter, BackgroundTasks
+import asyncio
+from typing import List
+from fastapi import APIRouter, BackgroundTasks, Body, HTTPException
 import time
 
-from app.worker import long_running_task, task_with_retry
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.result_backend import task_meta
+from app.core.task_batching import TaskBatcher
+from app.worker import long_running_task, process_order_batch, task_with_retry
 
 router = APIRouter()
 
+# Collects order submissions from concurrent requests into process_order_batch tasks
+order_batcher = TaskBatcher(
+    process_order_batch,
+    max_items=settings.ORDER_BATCH_MAX_ITEMS,
+    max_delay_ms=settings.ORDER_BATCH_MAX_DELAY_MS,
+)
+
 
 def write_notification(email: str, message: str):
 
@@ -37,6 +50,16 @@ async def run_retry_task(word: str):
 @router.post("/celery-order")
 async def run_order_task(order_id: str):
 
+    if settings.ORDER_BATCHING_ENABLED:
+        # Waits at most ORDER_BATCH_MAX_DELAY_MS for other orders to share the task
+        task_id = await order_batcher.add(order_id)
+        return {
+            "message": "Order Batched",
+            "task_id": task_id,
+            "order_id": order_id,
+            "hint": "The task result reports every order in the batch by id.",
+        }
+
     from app.worker import process_order 
     
     task = process_order.delay(order_id)
@@ -46,3 +69,38 @@ async def run_order_task(order_id: str):
         "order_id": order_id,
         "hint": "Check Worker logs to see if it processes or skips!"
     }
+
+@router.post("/celery-orders")
+async def run_order_tasks(order_ids: List[str] = Body(..., embed=True)):
+    """
+    Bulk submission: orders are sent in chunks of ORDER_BATCH_MAX_ITEMS, one
+    process_order_batch task per chunk.
+    """
+    if len(order_ids) > settings.ORDER_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.ORDER_BULK_MAX_ITEMS} orders per request.",
+        )
+
+    batches = await order_batcher.submit_many(order_ids)
+    return {
+        "message": "Orders Submitted",
+        "count": len(order_ids),
+        "batches": [{"task_id": task_id, "order_ids": chunk} for task_id, chunk in batches],
+    }
+
+@router.post("/celery-status")
+async def read_task_statuses(task_ids: List[str] = Body(..., embed=True)):
+    """
+    States of many tasks in one Redis round trip. Tasks that are unknown,
+    expired or don't store results (ignore_result) report PENDING.
+    """
+    if len(task_ids) > settings.TASK_STATUS_MAX_IDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.TASK_STATUS_MAX_IDS} task ids per request.",
+        )
+
+    # The result backend's client is synchronous
+    tasks = await asyncio.to_thread(task_meta, celery_app.backend, task_ids)
+    return {"tasks": tasks}
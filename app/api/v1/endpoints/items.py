@@ -1,99 +1,210 @@
 
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api import deps
+from app.core.config import settings
+from app.core.http_cache import PRIVATE_REVALIDATE, conditional_response
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_page_cursor
+from app.models.item import Item
 from app.schemas import item as item_schema
 from app.schemas import user as user_schema
-from app.schemas import item as item_schema
-from app.schemas import user as user_schema
-
-fake_items_db: dict = {}
-item_id_counter: int = 1
 
 router = APIRouter()
 
 @router.get("/", response_model=List[item_schema.Item])
-def read_items(
+async def read_items(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: user_schema.User = Depends(deps.get_current_active_user),
 ) -> Any:
-    
-    user_items = [item for item in fake_items_db.values() if item["owner_id"] == current_user.id]
-    return user_items[skip : skip + limit]
+
+    # Served by the (owner_id, id) index instead of scanning every item
+    statement = (
+        select(Item)
+        .where(Item.owner_id == current_user.id)
+        .order_by(Item.id)
+        .limit(limit)
+    )
+    if cursor:
+        statement = statement.where(Item.id > decode_cursor(cursor))
+    else:
+        statement = statement.offset(skip)
+    items = (await db.exec(statement)).all()
+    next_cursor = next_page_cursor(items, limit)
+    return conditional_response(
+        request,
+        List[item_schema.Item],
+        items,
+        cache_control=PRIVATE_REVALIDATE,
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
+    )
 
 @router.post("/", response_model=item_schema.Item)
-def create_item(
+async def create_item(
     *,
+    db: AsyncSession = Depends(deps.get_async_db),
     item_in: item_schema.ItemCreate,
     current_user: user_schema.User = Depends(deps.get_current_active_user),
 ) -> Any:
-  
-    item_data = item_in.model_dump()
-    global item_id_counter
-    item_id = item_id_counter
-    item_id_counter += 1
-    
-    new_item = {
-        "id": item_id,
-        "title": item_data["title"],
-        "description": item_data.get("description"),
-        "owner_id": current_user.id
-    }
-    fake_items_db[item_id] = new_item
-    return new_item
+
+    db_item = Item(
+        title=item_in.title,
+        description=item_in.description,
+        owner_id=current_user.id,
+    )
+    db.add(db_item)
+    await db.commit()
+    await db.refresh(db_item)
+    return db_item
+
+@router.post("/batch", response_model=List[item_schema.ItemBatchResult])
+async def batch_items(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    batch_in: item_schema.ItemBatchRequest,
+    current_user: user_schema.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Apply many create/update/delete operations in one request.
+    Auth runs once, every referenced item is loaded with a single query, and
+    all successful operations are committed in one transaction. Failed
+    operations are skipped and reported in their result entry.
+    """
+    operations = batch_in.operations
+    if len(operations) > settings.ITEM_BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.ITEM_BATCH_MAX_OPERATIONS} operations per batch.",
+        )
+
+    ids = {operation.id for operation in operations if operation.id is not None}
+    items = {}
+    if ids:
+        statement = select(Item).where(Item.id.in_(ids))
+        items = {item.id: item for item in (await db.exec(statement)).all()}
+
+    results: List[item_schema.ItemBatchResult] = []
+    applied = []
+    for index, operation in enumerate(operations):
+
+        def fail(status_code: int, detail: str) -> None:
+            results.append(item_schema.ItemBatchResult(
+                index=index, op=operation.op, status=status_code, detail=detail
+            ))
+
+        if operation.op == "create":
+            if not operation.data or not operation.data.title:
+                fail(422, "create requires data.title")
+                continue
+            item = Item(
+                title=operation.data.title,
+                description=operation.data.description,
+                owner_id=current_user.id,
+            )
+            db.add(item)
+            applied.append((index, operation.op, 201, item))
+            continue
+
+        if operation.id is None:
+            fail(422, f"{operation.op} requires id")
+            continue
+        item = items.get(operation.id)
+        if not item:
+            fail(404, "Item not found")
+            continue
+        if not current_user.is_superuser and (item.owner_id != current_user.id):
+            fail(400, "Not enough permissions")
+            continue
+
+        if operation.op == "update":
+            update_data = operation.data.model_dump(exclude_unset=True) if operation.data else {}
+            if "title" in update_data and not update_data["title"]:
+                fail(422, "title can't be empty")
+                continue
+            for field in update_data:
+                setattr(item, field, update_data[field])
+            db.add(item)
+        else:
+            await db.delete(item)
+            # Later operations in the same batch see it as gone
+            del items[operation.id]
+        applied.append((index, operation.op, 200, item))
+
+    if applied:
+        await db.commit()
+
+    for index, op, status_code, item in applied:
+        results.append(item_schema.ItemBatchResult(
+            index=index, op=op, status=status_code, item=item_schema.Item.model_validate(item)
+        ))
+    results.sort(key=lambda result: result.index)
+    return results
 
 @router.put("/{id}", response_model=item_schema.Item)
-def update_item(
+async def update_item(
     *,
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
     item_in: item_schema.ItemUpdate,
     current_user: user_schema.User = Depends(deps.get_current_active_user),
 ) -> Any:
-   
-    item = fake_items_db.get(id)
+
+    item = await db.get(Item, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    if not current_user.is_superuser and (item["owner_id"] != current_user.id):
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-        
+
     update_data = item_in.model_dump(exclude_unset=True)
-    
- 
+    # The column is NOT NULL; an explicit null would fail at commit as a 500
+    if "title" in update_data and not update_data["title"]:
+        raise HTTPException(status_code=422, detail="title can't be empty")
     for field in update_data:
-        item[field] = update_data[field]
-        
-    fake_items_db[id] = item
+        setattr(item, field, update_data[field])
+
+    db.add(item)
+    await db.commit()
+    await db.refresh(item)
     return item
 
 @router.get("/{id}", response_model=item_schema.Item)
-def read_item(
+async def read_item(
     *,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
     current_user: user_schema.User = Depends(deps.get_current_active_user),
 ) -> Any:
-  
-    item = fake_items_db.get(id)
+
+    item = await db.get(Item, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    if not current_user.is_superuser and (item["owner_id"] != current_user.id):
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    return item
+    return conditional_response(
+        request, item_schema.Item, item, cache_control=PRIVATE_REVALIDATE
+    )
 
 @router.delete("/{id}", response_model=item_schema.Item)
-def delete_item(
+async def delete_item(
     *,
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
     current_user: user_schema.User = Depends(deps.get_current_active_user),
 ) -> Any:
-   
-    item = fake_items_db.get(id)
+
+    item = await db.get(Item, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    if not current_user.is_superuser and (item["owner_id"] != current_user.id):
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-        
-        
-    del fake_items_db[id]
+
+    await db.delete(item)
+    await db.commit()
     return item
@@ -1,41 +1,155 @@
 
-from typing import Any, List
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+import asyncio
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, List, Literal, Optional, Tuple
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
-from sqlmodel import Session, select
+from sqlmodel import select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api import deps
 from app.core import security
+from app.core.config import settings
+from app.core.http_cache import PRIVATE_REVALIDATE, conditional_response
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_page_cursor
+from app.core.rate_limit import limit_signup
+from app.core.responses import model_response
+from app.core.user_import import insert_ignoring_duplicates, job_row
+from app.db.session import AsyncSessionLocal
 from app.schemas import user as user_schema
 from app.models.user import User
+from app.worker import import_users
 
 router = APIRouter()
 
+# Hash pool workers shared by all running bulk imports; the rest of the pool
+# stays free for interactive logins and signups
+_bulk_hash_slots = asyncio.Semaphore(
+    settings.USER_BULK_HASH_WORKERS or max(1, security.hash_pool.max_workers // 2)
+)
+
 @router.get("/", response_model=List[user_schema.User])
-def read_users(
+async def read_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(deps.get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: user_schema.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
     Retrieve users.
     Only superusers can see all users.
+    Pass the X-Next-Cursor header of the previous page as `cursor` to page by
+    primary key; `skip` is still accepted but gets slower the deeper it goes.
+    """
+    statement = select(User).order_by(User.id).limit(limit)
+    if cursor:
+        statement = statement.where(User.id > decode_cursor(cursor))
+    else:
+        statement = statement.offset(skip)
+    users = (await db.exec(statement)).all()
+    next_cursor = next_page_cursor(users, limit)
+    # Rows were validated on write; shape them into the schema without
+    # re-running EmailStr and let pydantic-core encode the list
+    return model_response(
+        List[user_schema.User],
+        users,
+        trusted=True,
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
+    )
+
+# Columns included in exports; hashed_password is never exported
+EXPORT_COLUMNS = (User.id, User.email, User.full_name, User.is_active, User.is_superuser)
+EXPORT_BATCH_SIZE = 1000
+
+async def _export_rows(fmt: str) -> AsyncIterator[str]:
+    # The request's session is closed before the body streams, so use our own.
+    # yield_per makes asyncpg use a server-side cursor: memory stays flat
+    # regardless of table size, and rows are formatted straight from tuples
+    # without building ORM objects or pydantic models.
+    async with AsyncSessionLocal() as db:
+        statement = (
+            select(*EXPORT_COLUMNS)
+            .order_by(User.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        result = await db.stream(statement)
+        names = [column.key for column in EXPORT_COLUMNS]
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            async for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            async for rows in result.partitions():
+                yield "".join(json.dumps(dict(zip(names, row))) + "\n" for row in rows)
+
+@router.get("/export")
+async def export_users(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_user: user_schema.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Stream every user as NDJSON or CSV.
+    Only superusers can export.
     """
-    statement = select(User).offset(skip).limit(limit)
-    users = db.exec(statement).all()
-    return users
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{fmt}"'},
+    )
 
-@router.post("/", response_model=user_schema.User)
-def create_user_open(
+# First-user bootstrap: the very first signup becomes a superuser.
+# Once any user exists that can never change (there is no delete path), so the
+# flag is cached per process and later signups skip the check entirely.
+_has_users = False
+_bootstrap_lock = asyncio.Lock()
+# Arbitrary constant key for pg_advisory_xact_lock
+FIRST_SUPERUSER_LOCK_KEY = 727_001
+
+async def _add_first_user_aware(db: AsyncSession, db_user: User) -> None:
+    global _has_users
+    if _has_users:
+        db.add(db_user)
+        await db.commit()
+        return
+
+    # Bootstrap path: serialize signups in this process, and across processes on
+    # Postgres with an advisory lock held until commit, so two concurrent first
+    # signups can't both see an empty table.
+    async with _bootstrap_lock:
+        if db.bind.dialect.name == "postgresql":
+            await db.exec(
+                text("SELECT pg_advisory_xact_lock(:key)"), params={"key": FIRST_SUPERUSER_LOCK_KEY}
+            )
+        first_user = (await db.exec(select(User.id).limit(1))).first()
+        db_user.is_superuser = first_user is None
+        db.add(db_user)
+        await db.commit()
+        _has_users = True
+
+@router.post("/", response_model=user_schema.User, dependencies=[Depends(limit_signup)])
+async def create_user_open(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: user_schema.UserCreate,
 ) -> Any:
    
     statement = select(User).where(User.email == user_in.email)
-    user_exists = db.exec(statement).first()
+    user_exists = (await db.exec(statement)).first()
     
     if user_exists:
         raise HTTPException(
@@ -43,7 +157,7 @@ def create_user_open(
             detail="The user with this username already exists in the system.",
         )
 
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = await security.get_password_hash_async(user_in.password)
     
     db_user = User(
         email=user_in.email,
@@ -52,54 +166,201 @@ def create_user_open(
         is_active=True,
         is_superuser=False
     )
-    
-
-    count_statement = select(User)
-    first_user = db.exec(count_statement).first()
-    if not first_user:
-        db_user.is_superuser = True
 
     try:
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await _add_first_user_aware(db, db_user)
+        await db.refresh(db_user)
         return db_user
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
 
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred while creating user."
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred."
         )
 
+_INVALID_JSON = object()
+
+def _parse_bulk_body(body: bytes, content_type: str) -> List[Any]:
+    # NDJSON: one object per line, a bad line only invalidates that row
+    if content_type.startswith("application/x-ndjson"):
+        rows: List[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                rows.append(_INVALID_JSON)
+        return rows
+
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        rows = None
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON.")
+    return rows
+
+def _enqueue_import(pending: List[Tuple[int, user_schema.UserCreate]]) -> List[str]:
+    rows = [job_row(index, user_in) for index, user_in in pending]
+    chunk = settings.USER_BULK_JOB_CHUNK_ROWS
+    return [import_users.delay(rows[start : start + chunk]).id for start in range(0, len(rows), chunk)]
+
+@router.post(
+    "/bulk",
+    response_model=List[user_schema.UserBulkResult],
+    responses={202: {"model": user_schema.UserBulkJob}},
+)
+async def create_users_bulk(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: user_schema.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Create many users at once.
+    Body is a JSON array of UserCreate objects, or NDJSON with
+    Content-Type: application/x-ndjson. Returns one result per input row.
+
+    Imports with more than USER_BULK_MAX_ROWS valid rows are answered with
+    202: the rows are created by import_users Celery tasks, whose results
+    (one per row, by index) are read through /demo-tasks/celery-status.
+
+    Each batch costs one duplicate check (email IN (...)) and one multi-row
+    INSERT; passwords are hashed in parallel on the hash pool, and only for
+    rows that will actually be inserted. Batches commit one by one: if one
+    fails, the rows already created stay "created" and the rest are "failed".
+    """
+    rows = _parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(rows) > settings.USER_BULK_JOB_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.USER_BULK_JOB_MAX_ROWS} users per request.",
+        )
+
+    results: List[Optional[user_schema.UserBulkResult]] = [None] * len(rows)
+    pending: List[Tuple[int, user_schema.UserCreate]] = []
+    seen_emails = set()
+    for index, row in enumerate(rows):
+        if row is _INVALID_JSON:
+            results[index] = user_schema.UserBulkResult(index=index, status="invalid", detail="Invalid JSON")
+            continue
+        try:
+            user_in = user_schema.UserCreate.model_validate(row)
+        except ValidationError as e:
+            error = e.errors()[0]
+            results[index] = user_schema.UserBulkResult(
+                index=index,
+                status="invalid",
+                detail=f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}",
+            )
+            continue
+        if user_in.email in seen_emails:
+            results[index] = user_schema.UserBulkResult(
+                index=index, status="duplicate", email=user_in.email, detail="Repeated in this request"
+            )
+            continue
+        seen_emails.add(user_in.email)
+        pending.append((index, user_in))
+
+    if len(pending) > settings.USER_BULK_MAX_ROWS:
+        # Too much argon2 work for one request; hash on the worker's cpu queue
+        task_ids = await asyncio.to_thread(_enqueue_import, pending)
+        job = user_schema.UserBulkJob(
+            queued=len(pending), task_ids=task_ids, results=[result for result in results if result is not None]
+        )
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(job))
+
+    async def hash_password(password: str) -> str:
+        async with _bulk_hash_slots:
+            return await security.get_password_hash_async(password)
+
+    insert_statement = insert_ignoring_duplicates(db.bind.dialect.name).returning(User.id, User.email)
+
+    try:
+        for start in range(0, len(pending), settings.USER_BULK_BATCH_SIZE):
+            batch = pending[start : start + settings.USER_BULK_BATCH_SIZE]
+
+            statement = select(User.email).where(User.email.in_([user_in.email for _, user_in in batch]))
+            existing = set((await db.exec(statement)).all())
+            to_create = [(index, user_in) for index, user_in in batch if user_in.email not in existing]
+
+            hashed_passwords = await asyncio.gather(
+                *(hash_password(user_in.password) for _, user_in in to_create)
+            )
+            params = [
+                {
+                    "email": user_in.email,
+                    "hashed_password": hashed_password,
+                    "full_name": user_in.full_name,
+                    "is_active": True,
+                    "is_superuser": False,
+                }
+                for (_, user_in), hashed_password in zip(to_create, hashed_passwords)
+            ]
+
+            created = {}
+            if params:
+                result = await db.exec(insert_statement, params=params)
+                created = {email: user_id for user_id, email in result.all()}
+                await db.commit()
+
+            for index, user_in in batch:
+                if user_in.email in created:
+                    results[index] = user_schema.UserBulkResult(
+                        index=index, status="created", email=user_in.email, id=created[user_in.email]
+                    )
+                else:
+                    results[index] = user_schema.UserBulkResult(
+                        index=index, status="duplicate", email=user_in.email, detail="Email already registered"
+                    )
+    except (SQLAlchemyError, security.PasswordHashPoolSaturated) as exc:
+        await db.rollback()
+        # Earlier batches are committed and keep their results; the failed
+        # batch and everything after it is reported per row, so the caller
+        # knows exactly which rows to send again
+        reason = "Database error" if isinstance(exc, SQLAlchemyError) else "Password hashing is overloaded"
+        for index, user_in in pending[start:]:
+            results[index] = user_schema.UserBulkResult(
+                index=index, status="failed", email=user_in.email, detail=f"{reason}; not created, retry this row"
+            )
+
+    return results
+
 @router.get("/me", response_model=user_schema.User)
-def read_user_me(
+async def read_user_me(
+    request: Request,
     current_user: user_schema.User = Depends(deps.get_current_active_user),
 ) -> Any:
 
-    return current_user
+    # current_user usually comes from the principal cache, so a matching
+    # If-None-Match is answered with 304 without touching the database
+    return conditional_response(request, user_schema.User, current_user, cache_control=PRIVATE_REVALIDATE)
 
 @router.put("/me", response_model=user_schema.User)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: user_schema.UserUpdate,
     current_user: user_schema.User = Depends(deps.get_current_active_user),
 ) -> Any:
    
-    db_user = db.get(User, current_user.id)
+    db_user = await db.get(User, current_user.id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # Evict under the old email too, in case this update changes it
+    await deps.invalidate_principal(db_user)
+
     user_data = user_in.dict(exclude_unset=True)
     if "password" in user_data and user_data["password"]:
-        hashed_password = security.get_password_hash(user_data["password"])
+        hashed_password = await security.get_password_hash_async(user_data["password"])
         del user_data["password"]
         db_user.hashed_password = hashed_password
         
@@ -107,6 +368,7 @@ def update_user_me(
         setattr(db_user, key, value)
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    await deps.invalidate_principal(db_user)
     return db_user
@@ -0,0 +1,156 @@
+"""
+app/core/access_log.py
+
+Non-blocking access log pipeline.
+
+The request path only builds a small dict and puts it on a bounded queue.
+A background thread drains the queue, formats records as JSON lines or
+logfmt and writes them in batches, so a slow log sink never adds latency
+to a response. Successful requests can be sampled; errors and slow
+requests are always kept.
+"""
+
+import json
+import queue
+import random
+import sys
+import threading
+from typing import Any, Dict, List, Optional, TextIO
+
+from app.core.config import settings
+
+_STOP = object()
+
+
+def format_json(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"), default=str)
+
+
+def format_logfmt(record: Dict[str, Any]) -> str:
+    parts = []
+    for key, value in record.items():
+        value = "" if value is None else str(value)
+        if not value or any(c in value for c in ' "='):
+            value = '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        parts.append(f"{key}={value}")
+    return " ".join(parts)
+
+
+FORMATTERS = {
+    "json": format_json,
+    "logfmt": format_logfmt,
+}
+
+
+class AccessLogWriter:
+    """
+    Queue-backed access log writer with batched output.
+
+    Args:
+        stream: File-like object records are written to.
+        fmt: "json" or "logfmt".
+        sample_rate: Fraction of non-error, non-slow requests to keep (0.0-1.0).
+        slow_ms: Requests at least this slow are always logged.
+        queue_size: Records beyond this backlog are dropped and counted.
+        batch_size: Maximum records written per flush.
+        flush_interval: Seconds the writer waits for more records before flushing.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        fmt: str = "json",
+        sample_rate: float = 1.0,
+        slow_ms: float = 500.0,
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ) -> None:
+        if fmt not in FORMATTERS:
+            raise ValueError(f"Unknown access log format: {fmt}")
+        self.stream = stream
+        self.formatter = FORMATTERS[fmt]
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def should_log(self, status: int, duration_ms: float) -> bool:
+        if status >= 400 or duration_ms >= self.slow_ms:
+            return True
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """
+        Queues a record without blocking. Starts the writer thread on first use.
+        """
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Flushes queued records and stops the writer thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch: List[Any] = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = _STOP in batch
+            lines = [self.formatter(record) + "\n" for record in batch if record is not _STOP]
+            if lines:
+                try:
+                    self.stream.write("".join(lines))
+                    self.stream.flush()
+                except Exception:
+                    # Losing log lines is preferable to killing the writer
+                    self.dropped += len(lines)
+            if stopping:
+                return
+
+
+def _open_stream() -> TextIO:
+    if settings.ACCESS_LOG_FILE:
+        return open(settings.ACCESS_LOG_FILE, "a", buffering=1 << 16)
+    return sys.stdout
+
+
+access_log = AccessLogWriter(
+    stream=_open_stream(),
+    fmt=settings.ACCESS_LOG_FORMAT,
+    sample_rate=settings.ACCESS_LOG_SAMPLE_RATE,
+    slow_ms=settings.ACCESS_LOG_SLOW_MS,
+    queue_size=settings.ACCESS_LOG_QUEUE_SIZE,
+    batch_size=settings.ACCESS_LOG_BATCH_SIZE,
+)
@@ -0,0 +1,104 @@
+"""
+app/core/cache.py
+
+Small in-process caches used on the request hot path.
+
+TTLCache is a bounded mapping with LRU eviction and a per-entry expiry.
+It is thread-safe because sync endpoints and dependencies run in
+Starlette's threadpool while async ones run on the event loop. Named caches
+export their hits, misses and evictions as Prometheus counters labelled
+cache=<name>.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.metrics import CACHE_EVICTIONS, CACHE_HITS, CACHE_MISSES
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Args:
+        maxsize: Maximum number of entries kept before the least recently
+            used one is evicted.
+        ttl: Default lifetime of an entry in seconds.
+        name: Exports the counters to Prometheus under this name.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: Optional[str] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._hit_counter = CACHE_HITS.labels(cache=name) if name else None
+        self._miss_counter = CACHE_MISSES.labels(cache=name) if name else None
+        self._eviction_counter = CACHE_EVICTIONS.labels(cache=name) if name else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._miss()
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self._miss()
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            if self._hit_counter is not None:
+                self._hit_counter.inc()
+            return value
+
+    def _miss(self) -> None:
+        self.misses += 1
+        if self._miss_counter is not None:
+            self._miss_counter.inc()
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        if lifetime <= 0 or self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + lifetime
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+                if self._eviction_counter is not None:
+                    self._eviction_counter.inc()
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns hit/miss counters and current size for monitoring.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
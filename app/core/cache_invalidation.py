@@ -0,0 +1,109 @@
+"""
+app/core/cache_invalidation.py
+
+Cross-process invalidation for the in-process TTL caches.
+
+Every API worker keeps its own TTLCache, so evicting an entry locally leaves
+stale copies in the other workers until their TTL runs out. Invalidations
+are therefore published on a Redis channel (through the shared API pool);
+each worker subscribes in the app lifespan and evicts the keys from its own
+registered cache. The cache hot path never talks to Redis.
+
+Delivery is at most once: a worker that loses its subscription clears its
+registered caches when it resubscribes, since it may have missed messages.
+While Redis is down, stale entries live at most the cache's TTL, so keep
+the TTL of caches holding mutable data short.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Hashable, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache:invalidate"
+
+
+class CacheInvalidator:
+
+    def __init__(self, channel: str = CHANNEL) -> None:
+        self.channel = channel
+        self.caches: Dict[str, TTLCache] = {}
+        self.client: Optional[redis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def register(self, cache: TTLCache) -> TTLCache:
+        """
+        Makes a named cache invalidatable by name from any process.
+        """
+        self.caches[cache.name] = cache
+        return cache
+
+    def start(self, client: redis.Redis) -> None:
+        """
+        Publishes through `client` and starts listening for other processes'
+        invalidations. Call from the app lifespan.
+        """
+        self.client = client
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self._listener = None
+        self.client = None
+
+    async def invalidate(self, cache_name: str, *keys: Hashable) -> None:
+        """
+        Evicts `keys` here and in every other subscribed process.
+        """
+        self.caches[cache_name].invalidate(*keys)
+        if self.client is None:
+            return
+        message = json.dumps({"cache": cache_name, "keys": [str(key) for key in keys]})
+        try:
+            await self.client.publish(self.channel, message)
+        except RedisError as exc:
+            logger.warning("Could not publish cache invalidation, other workers may serve stale %s entries: %s", cache_name, exc)
+
+    def _apply(self, data: bytes) -> None:
+        try:
+            message = json.loads(data)
+            cache = self.caches[message["cache"]]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed cache invalidation: %r", data)
+            return
+        cache.invalidate(*message["keys"])
+
+    async def _listen(self) -> None:
+        subscribed_before = False
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    if subscribed_before:
+                        # Invalidations sent while we were away are lost
+                        for cache in self.caches.values():
+                            cache.clear()
+                    subscribed_before = True
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None and message["type"] == "message":
+                            self._apply(message["data"])
+            except RedisError as exc:
+                logger.warning("Cache invalidation channel unavailable, retrying: %s", exc)
+                await asyncio.sleep(settings.CACHE_INVALIDATION_RETRY_SECONDS)
+
+
+cache_invalidator = CacheInvalidator()
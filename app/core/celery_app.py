@@ -1,13 +1,63 @@
+import os
+
 from celery import Celery
+from kombu import Queue
+
 from app.core.config import settings
 
 celery_app = Celery("worker", broker=settings.CELERY_BROKER_URL, include=["app.worker"])
 
+# Redis gets the app's backend (per-task TTLs, compressed large results). It is
+# bound as a class rather than through the result_backend URL, because Celery
+# prefers a CELERY_RESULT_BACKEND environment variable over the configured
+# URL; the backend reads its URL from settings instead.
+if settings.CELERY_RESULT_BACKEND.partition("://")[0] in ("redis", "rediss"):
+    celery_app.backend_cls = "app.core.result_backend:ResultBackend"
+
 celery_app.conf.update(
     task_track_started=True,
     result_backend=settings.CELERY_RESULT_BACKEND,
+    result_expires=settings.CELERY_RESULT_EXPIRES_SECONDS,
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Waiting-on-the-network tasks go to "io", compute-heavy ones to "cpu";
+    # run one worker per queue with the matching profile (run_worker.sh io|cpu)
+    task_default_queue="io",
+    task_routes={
+        "app.worker.long_running_task": {"queue": "cpu"},
+        "app.worker.import_users": {"queue": "cpu"},
+        "app.worker.*": {"queue": "io"},
+    },
+    # acks_late tasks whose worker process dies are redelivered, not lost
+    task_reject_on_worker_lost=True,
 )
 
+# Worker tuning per queue, applied when CELERY_WORKER_PROFILE is set.
+WORKER_PROFILES = {
+    # Tasks mostly wait (payment APIs, Redis): many threads per process and a
+    # small prefetch so short tasks don't wait on a broker round trip each.
+    "io": {
+        "task_queues": (Queue("io"),),
+        "worker_pool": "threads",
+        "worker_concurrency": settings.CELERY_IO_CONCURRENCY,
+        "worker_prefetch_multiplier": settings.CELERY_IO_PREFETCH_MULTIPLIER,
+    },
+    # Tasks hold a core for seconds: one process per core, and prefetch 1 so
+    # a busy process doesn't hoard acks_late messages another one could run.
+    # Recycling children bounds memory growth from long-lived processes.
+    "cpu": {
+        "task_queues": (Queue("cpu"),),
+        "worker_pool": "prefork",
+        "worker_concurrency": settings.CELERY_CPU_CONCURRENCY or os.cpu_count(),
+        "worker_prefetch_multiplier": settings.CELERY_CPU_PREFETCH_MULTIPLIER,
+        "worker_max_tasks_per_child": settings.CELERY_CPU_MAX_TASKS_PER_CHILD,
+    },
+}
+
+if settings.CELERY_WORKER_PROFILE:
+    celery_app.conf.update(WORKER_PROFILES[settings.CELERY_WORKER_PROFILE])
+
 # Scheduled Tasks (Cron Jobs)
 celery_app.conf.beat_schedule = {
     "run-every-30-seconds": {
@@ -0,0 +1,272 @@
+"""
+app/core/compression.py
+
+Response compression as a pure ASGI middleware.
+
+gzip is always available; brotli and zstd are used when the optional
+`brotli` / `zstandard` packages are installed. The coding is negotiated from
+Accept-Encoding (q-values respected, ties broken by server preference).
+
+- Single-message bodies below COMPRESSION_MINIMUM_SIZE are sent as-is.
+- Streaming bodies are compressed chunk by chunk with a sync flush after
+  each chunk, so clients still receive data as soon as it is produced.
+- Bodies of paths in COMPRESSION_CACHE_PATHS (e.g. the OpenAPI schema) are
+  compressed once; later requests reuse the cached bytes while the body is
+  unchanged.
+"""
+
+import hashlib
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class _Compressor(ABC):
+    """
+    Minimal streaming interface shared by every coding:
+    compress(chunk) -> bytes flushed so far, finish() -> trailing bytes.
+    """
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        ...
+
+
+class _GzipCompressor(_Compressor):
+
+    def __init__(self, level: int) -> None:
+        # wbits=31: zlib stream with a gzip header and trailer
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor(_Compressor):
+
+    def __init__(self, level: int) -> None:
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdCompressor(_Compressor):
+
+    def __init__(self, level: int) -> None:
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def available_encodings() -> Dict[str, Tuple[Callable[[int], _Compressor], int]]:
+    """
+    Supported codings in server preference order, each with its factory and
+    level. Levels are moderate: on-the-fly compression must stay cheaper
+    than the bandwidth it saves.
+    """
+    encodings: Dict[str, Tuple[Callable[[int], _Compressor], int]] = {}
+    if brotli is not None:
+        encodings["br"] = (_BrotliCompressor, settings.COMPRESSION_BROTLI_QUALITY)
+    if zstandard is not None:
+        encodings["zstd"] = (_ZstdCompressor, settings.COMPRESSION_ZSTD_LEVEL)
+    encodings["gzip"] = (_GzipCompressor, settings.COMPRESSION_GZIP_LEVEL)
+    return encodings
+
+
+def negotiate(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """
+    Picks the coding with the highest q-value; among equal q-values the
+    earlier entry in `supported` wins. Returns None for identity.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        excluded_content_types: Optional[List[str]] = None,
+        cache_paths: Optional[List[str]] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.excluded_content_types = tuple(excluded_content_types or ())
+        self.cache_paths = frozenset(cache_paths or ())
+        self.encodings = available_encodings()
+        self.supported = list(self.encodings)
+        # (path, coding) -> (body digest, compressed body)
+        self.static_cache = TTLCache(maxsize=64, ttl=24 * 60 * 60)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.supported)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, coding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compressible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] < 200 or message["status"] in (204, 206, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type or content_type.startswith(self.excluded_content_types):
+            return False
+        content_length = headers.get("content-length")
+        if content_length is not None and int(content_length) < self.minimum_size:
+            return False
+        return True
+
+    def compress_whole(self, path: str, coding: str, body: bytes) -> bytes:
+        factory, level = self.encodings[coding]
+        if path not in self.cache_paths:
+            compressor = factory(level)
+            return compressor.compress(body) + compressor.finish()
+
+        key = (path, coding)
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        cached = self.static_cache.get(key)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        compressor = factory(level)
+        compressed = compressor.compress(body) + compressor.finish()
+        self.static_cache.set(key, (digest, compressed))
+        return compressed
+
+
+class _CompressionResponder:
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, coding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.path = scope["path"]
+        self.coding = coding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.coding
+        headers.add_vary_header("Accept-Encoding")
+        # The compressed bytes are a different representation, so a strong
+        # validator no longer applies; weak comparison still matches it
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            if not self.middleware.compressible(message):
+                self.passthrough = True
+                await self._send(message)
+                return
+            # Hold the headers until the first body chunk shows whether
+            # this is a single-message body or a stream
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None and not more_body:
+            # Whole body in one message
+            start, self.start_message = self.start_message, None
+            if len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+            compressed = self.middleware.compress_whole(self.path, self.coding, body)
+            headers = MutableHeaders(scope=start)
+            self._mark_encoded(headers)
+            headers["Content-Length"] = str(len(compressed))
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        if self.start_message is not None:
+            # First chunk of a stream: the total length is unknown up front
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(scope=start)
+            self._mark_encoded(headers)
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            factory, level = self.middleware.encodings[self.coding]
+            self.compressor = factory(level)
+            await self._send(start)
+
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
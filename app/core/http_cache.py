@@ -0,0 +1,63 @@
+"""
+app/core/http_cache.py
+
+Conditional GET support for read endpoints.
+
+Responses carry a strong ETag (a hash of the serialized body) and a per-route
+Cache-Control policy. When the client's If-None-Match already names the
+current ETag, the body is dropped and a 304 Not Modified is sent instead, so
+polling clients only download a resource when it actually changed.
+"""
+
+import hashlib
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from app.core.responses import dump_json
+
+# Cache-Control policies. Responses are per-user (cookie auth), so never let
+# shared caches store them; "no-cache" still lets the browser keep a copy and
+# revalidate it with If-None-Match.
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison as required for If-None-Match (RFC 9110 13.1.2).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def conditional_response(
+    request: Request,
+    response_type: Any,
+    content: Any,
+    *,
+    cache_control: str = PRIVATE_REVALIDATE,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Serializes `content` as `response_type` and returns either a 200 with
+    ETag/Cache-Control or an empty 304 if the client's copy is current.
+    """
+    body = dump_json(response_type, content)
+    etag = make_etag(body)
+    response_headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Cookie",
+        **(headers or {}),
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=response_headers)
+    return Response(content=body, media_type="application/json", headers=response_headers)
@@ -0,0 +1,319 @@
+"""
+app/core/idempotency.py
+
+Idempotency-Key support for mutating endpoints.
+
+A client that may retry a POST sends a unique `Idempotency-Key` header. The
+first request with a key runs normally and its response is stored for
+IDEMPOTENCY_TTL_SECONDS; retries get the stored response back (with
+`Idempotent-Replayed: true`) without running the endpoint again.
+
+- Keys are scoped by method, path and caller (a digest of the auth cookie or
+  API key), so two users can't collide or read each other's responses.
+- While the first request is still running, the key is locked and retries
+  get 409 with Retry-After. The lock expires after
+  IDEMPOTENCY_LOCK_TTL_SECONDS in case the process dies mid-request.
+- Reusing a key with a different body or query string is rejected with 422.
+- 5xx, 409 and 429 responses are not stored; the lock is released so the
+  client can retry for real.
+
+Stores are pluggable: RedisIdempotencyStore uses the shared API Redis pool
+(`app.state.redis`), MemoryIdempotencyStore is per process. If Redis fails,
+the middleware uses the in-process store for IDEMPOTENCY_REDIS_RETRY_SECONDS.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Added by outer middleware on every response; never replayed
+_VOLATILE_HEADERS = {b"x-request-id", b"x-process-time", b"date", b"server"}
+
+
+class IdempotencyStore(ABC):
+    """
+    Records are JSON-serializable dicts. An in-flight record is
+    {"state": "in_flight", "fingerprint": ..., "token": ...}; a completed one
+    adds the stored response.
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, record: Dict[str, Any], ttl: float) -> Optional[Dict[str, Any]]:
+        """
+        Stores `record` if the key is free and returns None; otherwise
+        returns the existing record untouched.
+        """
+
+    @abstractmethod
+    async def complete(self, key: str, record: Dict[str, Any], ttl: float) -> None:
+        """
+        Replaces the in-flight lock with the completed record.
+        """
+
+    @abstractmethod
+    async def release(self, key: str, token: str) -> None:
+        """
+        Deletes the key if it still holds the lock identified by `token`.
+        """
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._records = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def acquire(self, key: str, record: Dict[str, Any], ttl: float) -> Optional[Dict[str, Any]]:
+        # No await between the read and the write, so this is atomic on the loop
+        existing = self._records.get(key)
+        if existing is not None:
+            return existing
+        self._records.set(key, record, ttl=ttl)
+        return None
+
+    async def complete(self, key: str, record: Dict[str, Any], ttl: float) -> None:
+        self._records.set(key, record, ttl=ttl)
+
+    async def release(self, key: str, token: str) -> None:
+        existing = self._records.get(key)
+        if existing is not None and existing.get("token") == token:
+            self._records.invalidate(key)
+
+
+# Deletes the key only while it still holds our in-flight lock
+_RELEASE_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value and cjson.decode(value)['token'] == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+
+    def __init__(self, client, prefix: str = "idempotency") -> None:
+        self.client = client
+        self.prefix = prefix
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    async def acquire(self, key: str, record: Dict[str, Any], ttl: float) -> Optional[Dict[str, Any]]:
+        name = f"{self.prefix}:{key}"
+        if await self.client.set(name, json.dumps(record), nx=True, px=int(ttl * 1000)):
+            return None
+        existing = await self.client.get(name)
+        if existing is None:
+            # Expired between SET and GET; treat as still locked, the client retries
+            return {"state": "in_flight", "fingerprint": record["fingerprint"]}
+        return json.loads(existing)
+
+    async def complete(self, key: str, record: Dict[str, Any], ttl: float) -> None:
+        await self.client.set(f"{self.prefix}:{key}", json.dumps(record), px=int(ttl * 1000))
+
+    async def release(self, key: str, token: str) -> None:
+        await self._release(keys=[f"{self.prefix}:{key}"], args=[token])
+
+
+def scoped_key(scope: Scope, headers: Headers, key: str) -> str:
+    caller = headers.get("x-api-key") or _cookie(headers, "access_token") or "anonymous"
+    material = "\0".join((scope["method"], scope["path"], caller, key))
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _cookie(headers: Headers, name: str) -> Optional[str]:
+    for part in headers.get("cookie", "").split(";"):
+        cookie_name, _, value = part.strip().partition("=")
+        if cookie_name == name:
+            return value
+    return None
+
+
+class IdempotencyMiddleware:
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        methods: Optional[List[str]] = None,
+        paths: Optional[List[str]] = None,
+        memory_store: Optional[IdempotencyStore] = None,
+    ) -> None:
+        self.app = app
+        self.methods = frozenset(method.upper() for method in (methods or ["POST", "PATCH"]))
+        # None means every path
+        self.paths = tuple(paths) if paths is not None else None
+        self.memory_store = memory_store or MemoryIdempotencyStore(
+            maxsize=settings.IDEMPOTENCY_MEMORY_MAXSIZE, ttl=settings.IDEMPOTENCY_TTL_SECONDS
+        )
+        self._redis_store: Optional[RedisIdempotencyStore] = None
+        self._redis_down_until = 0.0
+
+    def store(self, scope: Scope) -> IdempotencyStore:
+        if settings.IDEMPOTENCY_BACKEND != "redis" or time.monotonic() < self._redis_down_until:
+            return self.memory_store
+        client = getattr(scope["app"].state, "redis", None)
+        if client is None:
+            # Lifespan hasn't created the shared pool (e.g. a bare ASGI client)
+            return self.memory_store
+        if self._redis_store is None or self._redis_store.client is not client:
+            self._redis_store = RedisIdempotencyStore(client)
+        return self._redis_store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.methods
+            or (self.paths is not None and not scope["path"].startswith(self.paths))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters."}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        # The body is part of the fingerprint, so read it up front and replay
+        # it to the endpoint
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(scope["query_string"] + b"\0" + body).hexdigest()
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        store_key = scoped_key(scope, headers, key)
+        token = uuid.uuid4().hex
+        lock = {"state": "in_flight", "fingerprint": fingerprint, "token": token}
+        store = self.store(scope)
+        try:
+            existing = await store.acquire(store_key, lock, settings.IDEMPOTENCY_LOCK_TTL_SECONDS)
+        except RedisError as exc:
+            # Degrade to per-process deduplication rather than failing the request
+            logger.warning("Idempotency store unavailable, using the in-process store: %s", exc)
+            self._redis_down_until = time.monotonic() + settings.IDEMPOTENCY_REDIS_RETRY_SECONDS
+            store = self.memory_store
+            existing = await store.acquire(store_key, lock, settings.IDEMPOTENCY_LOCK_TTL_SECONDS)
+
+        if existing is not None:
+            await self._answer_duplicate(existing, fingerprint, scope, receive, send)
+            return
+
+        await self._run_and_store(scope, replay_receive, send, store, store_key, fingerprint, token)
+
+    async def _answer_duplicate(
+        self, existing: Dict[str, Any], fingerprint: str, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if existing.get("fingerprint") != fingerprint:
+            response = JSONResponse(
+                {"detail": "Idempotency-Key was already used with a different request."}, status_code=422
+            )
+        elif existing.get("state") != "completed":
+            response = JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still being processed."},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+        else:
+            stored_headers = [
+                (name.encode("latin-1"), value.encode("latin-1")) for name, value in existing["headers"]
+            ]
+            await send({
+                "type": "http.response.start",
+                "status": existing["status"],
+                "headers": stored_headers + [(REPLAYED_HEADER.lower().encode(), b"true")],
+            })
+            await send({"type": "http.response.body", "body": base64.b64decode(existing["body"])})
+            return
+        await response(scope, receive, send)
+
+    async def _run_and_store(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        store: IdempotencyStore,
+        store_key: str,
+        fingerprint: str,
+        token: str,
+    ) -> None:
+        status_code = 500
+        response_headers: List[List[str]] = []
+        body_parts: List[bytes] = []
+        body_size = 0
+        cacheable = True
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, body_size, cacheable
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in _VOLATILE_HEADERS
+                )
+            elif message["type"] == "http.response.body" and cacheable:
+                # Stream to the client as usual, keep a copy for replays
+                body_parts.append(message.get("body", b""))
+                body_size += len(body_parts[-1])
+                if body_size > settings.IDEMPOTENCY_MAX_BODY_BYTES:
+                    cacheable = False
+                    body_parts.clear()
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, receive, send_wrapper)
+            completed = True
+        finally:
+            storable = completed and cacheable and status_code < 500 and status_code not in (409, 429)
+            try:
+                if storable:
+                    await store.complete(store_key, {
+                        "state": "completed",
+                        "fingerprint": fingerprint,
+                        "status": status_code,
+                        "headers": response_headers,
+                        "body": base64.b64encode(b"".join(body_parts)).decode(),
+                    }, settings.IDEMPOTENCY_TTL_SECONDS)
+                else:
+                    await store.release(store_key, token)
+            except RedisError as exc:
+                logger.warning("Could not record idempotent response: %s", exc)
@@ -0,0 +1,202 @@
+"""
+app/core/metrics.py
+
+Prometheus metrics for the API, the database pool, password hashing and
+Celery workers.
+
+Multiprocess mode:
+When several processes serve traffic (uvicorn --workers, gunicorn, Celery
+prefork), set the PROMETHEUS_MULTIPROC_DIR environment variable to an empty,
+writable directory shared by all of them before they start. Each process then
+writes its samples there and /metrics aggregates them, so counters and
+histograms add up across workers. Without the variable, metrics come from
+the current process only.
+"""
+
+import os
+import time
+from typing import Dict
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+
+MULTIPROCESS_MODE = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+    multiprocess_mode="livesum",
+)
+
+# IN-PROCESS CACHES (named app.core.cache.TTLCache instances)
+CACHE_HITS = Counter("cache_hits_total", "Cache lookups that found a live entry.", ["cache"])
+CACHE_MISSES = Counter("cache_misses_total", "Cache lookups that found nothing or an expired entry.", ["cache"])
+CACHE_EVICTIONS = Counter("cache_evictions_total", "Entries evicted to stay within maxsize.", ["cache"])
+
+# DATABASE POOL
+# Every pool metric carries a "pool" label ("sync" or "async"): the two
+# engines have separate pools and their numbers must not be mixed.
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond pool_size.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "How long a connection stays checked out before it is returned.",
+    ["pool"],
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool, including pre-ping and connect.",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_CONNECTION_EVENTS = Counter(
+    "db_pool_connection_events_total",
+    "Connection churn: new connections, closes and invalidations.",
+    ["pool", "event"],
+)
+
+# PASSWORD HASHING (app/core/security.py hash_pool)
+PASSWORD_HASH_QUEUED = Gauge(
+    "password_hash_queued",
+    "Password hash jobs waiting for a worker.",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_RUNNING = Gauge(
+    "password_hash_running",
+    "Password hash jobs currently running.",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password hash jobs rejected because the queue was full.",
+)
+
+# CELERY
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task runtime.",
+    ["task", "state"],
+)
+CELERY_TASK_RETRIES = Counter(
+    "celery_task_retries_total",
+    "Celery task retries.",
+    ["task"],
+)
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """
+    Serves all metrics in the Prometheus text format.
+    """
+    if MULTIPROCESS_MODE:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Hooks pool events on `engine` to track checkouts, overflow and connection
+    churn, labelled pool=`name`.
+    """
+    pool = engine.pool
+    checked_out = DB_POOL_CHECKED_OUT.labels(pool=name)
+    overflow_gauge = DB_POOL_OVERFLOW.labels(pool=name)
+    checkout_duration = DB_POOL_CHECKOUT_DURATION.labels(pool=name)
+
+    def update_overflow_gauge() -> None:
+        # overflow() starts at -pool_size and only goes positive once the pool is exhausted
+        overflow = getattr(pool, "overflow", None)
+        if overflow is not None:
+            overflow_gauge.set(max(overflow(), 0))
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        checked_out.inc()
+        update_overflow_gauge()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            checkout_duration.observe(time.perf_counter() - checked_out_at)
+            checked_out.dec()
+        update_overflow_gauge()
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record) -> None:
+        DB_POOL_CONNECTION_EVENTS.labels(pool=name, event="connect").inc()
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection, connection_record) -> None:
+        DB_POOL_CONNECTION_EVENTS.labels(pool=name, event="close").inc()
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception) -> None:
+        DB_POOL_CONNECTION_EVENTS.labels(pool=name, event="invalidate").inc()
+
+    @event.listens_for(pool, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception) -> None:
+        DB_POOL_CONNECTION_EVENTS.labels(pool=name, event="soft_invalidate").inc()
+
+
+def instrument_celery() -> None:
+    """
+    Connects Celery signals that record task runtime and retries.
+    Call this once from the worker module.
+    """
+    from celery import signals
+
+    started: Dict[str, float] = {}
+
+    @signals.task_prerun.connect(weak=False)
+    def on_task_prerun(task_id=None, task=None, **kwargs) -> None:
+        started[task_id] = time.perf_counter()
+
+    @signals.task_postrun.connect(weak=False)
+    def on_task_postrun(task_id=None, task=None, state=None, **kwargs) -> None:
+        start = started.pop(task_id, None)
+        if start is not None:
+            CELERY_TASK_DURATION.labels(task=task.name, state=state or "UNKNOWN").observe(
+                time.perf_counter() - start
+            )
+
+    @signals.task_retry.connect(weak=False)
+    def on_task_retry(sender=None, **kwargs) -> None:
+        CELERY_TASK_RETRIES.labels(task=sender.name).inc()
+
+    if MULTIPROCESS_MODE:
+        @signals.worker_process_shutdown.connect(weak=False)
+        def on_worker_process_shutdown(pid=None, **kwargs) -> None:
+            multiprocess.mark_process_dead(pid or os.getpid())
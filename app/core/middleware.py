@@ -1,45 +1,121 @@
 
 import time
-import logging
 import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core import metrics
+from app.core.access_log import access_log
+from app.core.config import settings
 
+# Both middlewares are plain ASGI apps rather than BaseHTTPMiddleware subclasses.
+# They only touch the `http.response.start` message, so there is no extra task
+# or memory stream per request and streaming responses pass through untouched.
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+class RequestIDMiddleware:
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    
-    async def dispatch(self, request: Request, call_next):
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
-
-class LogRequestMiddleware(BaseHTTPMiddleware):
-    
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        response = await call_next(request)
-        
-        process_time = (time.time() - start_time) * 1000
-        formatted_process_time = "{0:.2f}".format(process_time)
-        
-        
-        request_id = getattr(request.state, "request_id", "limitless")
-
-        logger.info(
-            f"id={request_id} "
-            f"method={request.method} "
-            f"path={request.url.path} "
-            f"status={response.status_code} "
-            f"duration={formatted_process_time}ms"
-        )
-        
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        return response
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+class LogRequestMiddleware:
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter_ns()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Time to response headers, in milliseconds
+                process_time = (time.perf_counter_ns() - start_time) / 1_000_000
+                MutableHeaders(scope=message).append("X-Process-Time", str(process_time))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = (time.perf_counter_ns() - start_time) / 1_000_000
+            if settings.ACCESS_LOG_ENABLED and access_log.should_log(status_code, duration):
+                # Formatting and I/O happen on the access log thread
+                client = scope.get("client")
+                access_log.submit({
+                    "ts": time.time(),
+                    "id": scope.get("state", {}).get("request_id", "limitless"),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(duration, 2),
+                    "client": client[0] if client else None,
+                })
+
+def route_template(scope: Scope) -> str:
+    """
+    The path template of the route that served the request, or "not_found".
+    """
+    # FastAPI's APIRoute puts itself in the scope
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (app.add_route, e.g. /metrics) don't; match again
+    router = getattr(scope.get("app"), "router", None)
+    for candidate in getattr(router, "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match != Match.NONE:
+            return getattr(candidate, "path", "unmatched")
+    return "not_found"
+
+class PrometheusMiddleware:
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter_ns()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Label by the route template (e.g. /api/v1/items/{id}) so raw ids
+            # don't explode label cardinality
+            metrics.HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=route_template(scope),
+                status=status_code,
+            ).observe((time.perf_counter_ns() - start_time) / 1_000_000_000)
@@ -0,0 +1,104 @@
+"""
+app/core/openapi.py
+
+Precomputed OpenAPI document.
+
+FastAPI builds the schema on the first request to the OpenAPI URL, walking
+every route in every worker, and re-serializes the cached dict on each later
+request. With OPENAPI_PRECOMPUTE enabled the document is built (or loaded
+from OPENAPI_SCHEMA_FILE) during startup and served as ready-made bytes.
+
+Write the build artifact with:
+    python -m app.core.openapi openapi.json
+"""
+
+import json
+import logging
+import os
+import sys
+from typing import Optional
+
+from fastapi import FastAPI, Request, Response
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.http_cache import etag_matches, make_etag
+
+logger = logging.getLogger(__name__)
+
+
+class OpenAPIDocument:
+
+    def __init__(self) -> None:
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+
+    def load(self, app: FastAPI) -> None:
+        """
+        Loads the artifact from OPENAPI_SCHEMA_FILE when it exists, otherwise
+        generates the schema from the app's routes.
+        """
+        path = settings.OPENAPI_SCHEMA_FILE
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                body = f.read()
+            # Also seed app.openapi() so anything else asking for the schema
+            # doesn't regenerate it
+            app.openapi_schema = json.loads(body)
+            logger.info("Loaded OpenAPI schema from %s", path)
+        else:
+            if path:
+                logger.warning("OpenAPI schema file %s not found, generating it", path)
+            body = serialize(app.openapi())
+        self.body = body
+        self.etag = make_etag(body)
+
+    async def endpoint(self, request: Request) -> Response:
+        if self.body is None:
+            # Lifespan didn't run (e.g. a bare ASGI test client)
+            self.load(request.app)
+        headers = {"ETag": self.etag, "Cache-Control": "public, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+openapi_document = OpenAPIDocument()
+
+
+def serialize(schema: dict) -> bytes:
+    return json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def install(app: FastAPI) -> None:
+    """
+    Replaces FastAPI's generated OpenAPI route with one serving the
+    precomputed bytes. The Swagger/ReDoc pages keep pointing at the same URL.
+
+    Unlike the built-in route this doesn't add the ASGI root_path to
+    "servers"; set `servers` on the app explicitly when behind a path prefix.
+    """
+    url = app.openapi_url
+    if not url:
+        return
+    app.router.routes = [
+        route for route in app.router.routes
+        if not (isinstance(route, Route) and route.path == url)
+    ]
+    app.add_route(url, openapi_document.endpoint, include_in_schema=False)
+
+
+def main() -> int:
+    if len(sys.argv) != 2:
+        print("usage: python -m app.core.openapi <output.json>", file=sys.stderr)
+        return 2
+    from app.main import app as fastapi_app
+
+    with open(sys.argv[1], "wb") as f:
+        f.write(serialize(fastapi_app.openapi()))
+    print(f"Wrote OpenAPI schema to {sys.argv[1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+app/core/pagination.py
+
+Opaque cursors for keyset pagination.
+
+A cursor encodes the primary key of the last row on a page. The next page is
+fetched with `WHERE id > :last_id ORDER BY id LIMIT :limit`, which is an index
+range scan whose cost does not grow with page depth, unlike OFFSET.
+"""
+
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Returns the last seen id from a cursor, or raises 400 if it is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+        if not isinstance(last_id, int):
+            raise ValueError(last_id)
+        return last_id
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def next_page_cursor(rows: list, limit: int) -> Optional[str]:
+    """
+    Returns the cursor of the page after `rows`, or None if this page was the
+    last one (not full). Endpoints send it in the X-Next-Cursor header, so the
+    body keeps its plain-list shape and offset clients are unaffected.
+    """
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1].id)
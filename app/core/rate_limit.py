@@ -0,0 +1,183 @@
+"""
+app/core/rate_limit.py
+
+Token-bucket rate limiting for endpoints that run argon2 (login, signup).
+
+Each bucket holds up to `capacity` tokens and refills at `capacity / period`
+tokens per second; a request spends one token. Buckets live in Redis so all
+API processes share them. A single Lua script checks every bucket involved
+in a request (e.g. per-IP and per-account) and spends the tokens only if all
+of them allow it, so concurrent requests can't race past the limit. The
+script reads the clock from Redis, so API hosts need not agree on the time.
+
+The limiter uses the API's shared Redis pool, bound in the app lifespan.
+Until then, or if Redis can't be reached, it falls back to in-process
+buckets (per-worker limits) and retries Redis after
+RATE_LIMIT_REDIS_RETRY_SECONDS.
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import redis.asyncio as redis
+from fastapi import HTTPException, Request
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS: bucket keys. ARGV: capacity and refill rate (tokens/s) per key, in
+# KEYS order. Returns {allowed, retry_after_seconds}.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local levels = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if tokens == nil then
+        tokens = capacity
+        ts = now
+    end
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        retry_after = math.max(retry_after, (1 - tokens) / rate)
+    end
+    levels[i] = tokens
+end
+local allowed = retry_after == 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local tokens = levels[i]
+    if allowed then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+end
+return {allowed and 1 or 0, tostring(retry_after)}
+"""
+
+
+class Limit(NamedTuple):
+    key: str
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+
+class MemoryBuckets:
+    """
+    In-process token buckets with the same semantics as the Lua script.
+    """
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        self._buckets = TTLCache(maxsize=maxsize, ttl=24 * 60 * 60)
+        self._lock = threading.Lock()
+
+    def hit(self, limits: List[Limit]) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            retry_after = 0.0
+            for limit in limits:
+                tokens, ts = self._buckets.get(limit.key) or (limit.capacity, now)
+                tokens = min(limit.capacity, tokens + max(0.0, now - ts) * limit.rate)
+                if tokens < 1:
+                    retry_after = max(retry_after, (1 - tokens) / limit.rate)
+                levels.append(tokens)
+            allowed = retry_after == 0
+            for limit, tokens in zip(limits, levels):
+                if allowed:
+                    tokens -= 1
+                self._buckets.set(limit.key, (tokens, now), ttl=limit.period)
+            return allowed, retry_after
+
+
+class RateLimiter:
+
+    def __init__(self, client: Optional[redis.Redis] = None, prefix: str = "ratelimit") -> None:
+        self.prefix = prefix
+        self.memory = MemoryBuckets()
+        self.bind(client)
+
+    def bind(self, client: Optional[redis.Redis]) -> None:
+        """
+        Points the limiter at a Redis client; None means in-process only.
+        """
+        self.redis = client
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT) if client is not None else None
+        self._redis_down_until = 0.0
+
+    async def _hit_redis(self, limits: List[Limit]) -> Tuple[bool, float]:
+        keys = [f"{self.prefix}:{limit.key}" for limit in limits]
+        args = []
+        for limit in limits:
+            args.extend((limit.capacity, limit.rate))
+        # EVALSHA, falling back to EVAL the first time the script is seen
+        allowed, retry_after = await self._script(keys=keys, args=args)
+        return bool(int(allowed)), float(retry_after)
+
+    async def hit(self, *limits: Limit) -> None:
+        """
+        Spends one token from every bucket, or none if any bucket is empty.
+        Raises 429 with Retry-After when the request is over a limit.
+        """
+        if not settings.RATE_LIMIT_ENABLED or not limits:
+            return
+
+        result = None
+        if self.redis is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                result = await self._hit_redis(list(limits))
+            except RedisError as exc:
+                logger.warning("Rate limit store unavailable, using in-process buckets: %s", exc)
+                self._redis_down_until = time.monotonic() + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+        if result is None:
+            result = self.memory.hit(list(limits))
+
+        allowed, retry_after = result
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please retry later.",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+
+def client_ip(request: Request) -> str:
+    # Run uvicorn with --proxy-headers behind a trusted proxy so this is the
+    # real client address rather than the proxy's
+    return request.client.host if request.client else "unknown"
+
+
+def ip_limit(name: str, request: Request, capacity: int) -> Limit:
+    return Limit(f"{name}:ip:{client_ip(request)}", capacity, settings.RATE_LIMIT_PERIOD_SECONDS)
+
+
+def account_limit(name: str, account: str, capacity: int) -> Limit:
+    return Limit(f"{name}:account:{account.lower()}", capacity, settings.RATE_LIMIT_PERIOD_SECONDS)
+
+
+# Bound to app.state.redis during startup when RATE_LIMIT_BACKEND is "redis"
+rate_limiter = RateLimiter()
+
+
+async def limit_signup(request: Request) -> None:
+    """
+    Per-IP throttle for open signup.
+    """
+    await rate_limiter.hit(ip_limit("signup", request, settings.RATE_LIMIT_SIGNUP_PER_IP))
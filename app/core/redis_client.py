@@ -0,0 +1,62 @@
+"""
+app/core/redis_client.py
+
+The API's shared async Redis client.
+
+One connection pool per API process, created in the app lifespan and stored
+on `app.state.redis`. Endpoints get it through `deps.get_redis`; middleware
+and other app-level code read it from `scope["app"].state.redis`. Rate
+limiting, caching and idempotency all borrow connections from this pool
+instead of opening their own.
+
+Batch several commands into one round trip with a pipeline:
+
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.get("a").get("b")
+        a, b = await pipe.execute()
+"""
+
+import logging
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def create_redis() -> redis.Redis:
+    """
+    Builds a pooled client from Settings. Connections are opened lazily, so
+    this never blocks on Redis.
+
+    Callers wait up to REDIS_POOL_TIMEOUT for a free connection instead of
+    failing immediately once REDIS_MAX_CONNECTIONS are in use. Idle
+    connections are PINGed before reuse when older than
+    REDIS_HEALTH_CHECK_INTERVAL, so connections dropped by the server or a
+    proxy are replaced transparently.
+    """
+    pool = redis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        retry_on_timeout=True,
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+async def ping(client: redis.Redis) -> bool:
+    try:
+        return bool(await client.ping())
+    except RedisError as exc:
+        logger.warning("Redis is unreachable at %s: %s", settings.REDIS_URL, exc)
+        return False
+
+
+async def close(client: redis.Redis) -> None:
+    # Also disconnects the pool the client owns
+    await client.aclose(close_connection_pool=True)
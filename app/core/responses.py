@@ -0,0 +1,77 @@
+"""
+app/core/responses.py
+
+Serialization helpers for hot read endpoints.
+
+By default FastAPI validates whatever an endpoint returns against its
+response_model, converts the result to JSON-compatible Python objects and
+then encodes those with the response class. For large lists most of that
+work is redundant. `model_response` validates the rows once, straight from
+ORM attributes, and lets pydantic-core write the JSON bytes directly.
+
+With `trusted=True` validation is skipped as well: rows read back from our
+own database were validated when they were written, and re-running
+validators such as EmailStr on the way out is the single largest cost of
+serializing a user list.
+
+Endpoints using it keep their `response_model=` for the OpenAPI schema; the
+returned Response bypasses FastAPI's own serialization.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    # Building an adapter compiles a core schema; do it once per type
+    return TypeAdapter(response_type)
+
+
+def _construct(model: type, row: Any) -> BaseModel:
+    if isinstance(row, model):
+        return row
+    return model.model_construct(**{name: getattr(row, name) for name in model.model_fields})
+
+
+def construct(response_type: Any, data: Any) -> Any:
+    """
+    Builds `response_type` (a schema model or List[model]) from attributes
+    without running validators. Only for data that is already known to be
+    valid.
+    """
+    if get_origin(response_type) in (list, List):
+        (model,) = get_args(response_type)
+        return [_construct(model, row) for row in data]
+    return _construct(response_type, data)
+
+
+def dump_json(response_type: Any, data: Any, trusted: bool = False) -> bytes:
+    """
+    Validates `data` (ORM objects, dicts or schema instances) as
+    `response_type`, or just shapes it when `trusted`, and returns the JSON
+    body.
+    """
+    adapter = type_adapter(response_type)
+    if trusted:
+        return adapter.dump_json(construct(response_type, data))
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def model_response(
+    response_type: Any,
+    data: Any,
+    *,
+    trusted: bool = False,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    return Response(
+        content=dump_json(response_type, data, trusted=trusted),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
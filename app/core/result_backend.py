@@ -0,0 +1,92 @@
+"""
+app/core/result_backend.py
+
+The Celery result backend: Celery's Redis backend with per-task result
+policies.
+
+- Results expire after CELERY_RESULT_EXPIRES_SECONDS unless the task sets its
+  own TTL: `@celery_app.task(result_expires=600)`. Tasks whose results nobody
+  reads should use `ignore_result=True` instead, so nothing is written.
+- Payloads above CELERY_RESULT_COMPRESSION_MIN_BYTES are stored
+  zlib-compressed. Small ones stay plain JSON; compressing them costs more
+  CPU than it saves Redis memory. Reads handle both, so results written
+  before compression was enabled still decode.
+
+`task_meta` reads many task states with a single MGET for status endpoints,
+instead of one AsyncResult round trip per id.
+"""
+
+import zlib
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence
+
+from celery import states
+from celery.backends.redis import RedisBackend
+
+from app.core.config import settings
+
+# JSON payloads never start with this, so plain and compressed values can
+# share the keyspace
+_COMPRESSED = b"zlib:"
+
+# TTL of the result being stored; set around each store so _set() can see it
+_result_expires: ContextVar[Optional[float]] = ContextVar("result_expires", default=None)
+
+
+class ResultBackend(RedisBackend):
+
+    def __init__(self, url: Optional[str] = None, **kwargs) -> None:
+        # Bound by class name (see celery_app.py), so Celery passes no URL
+        super().__init__(url=url or settings.CELERY_RESULT_BACKEND, **kwargs)
+
+    def _store_result(self, task_id, result, state, traceback=None, request=None, **kwargs):
+        task = self.app.tasks.get(getattr(request, "task", None))
+        token = _result_expires.set(getattr(task, "result_expires", None))
+        try:
+            return super()._store_result(task_id, result, state, traceback, request, **kwargs)
+        finally:
+            _result_expires.reset(token)
+
+    def _set(self, key, value):
+        expires = _result_expires.get() or self.expires
+        with self.client.pipeline() as pipe:
+            if expires:
+                pipe.setex(key, int(expires), value)
+            else:
+                pipe.set(key, value)
+            pipe.publish(key, value)
+            pipe.execute()
+
+    def encode(self, data):
+        payload = super().encode(data)
+        if isinstance(payload, str):
+            payload = payload.encode()
+        if len(payload) < settings.CELERY_RESULT_COMPRESSION_MIN_BYTES:
+            return payload
+        return _COMPRESSED + zlib.compress(payload, settings.CELERY_RESULT_COMPRESSION_LEVEL)
+
+    def decode(self, payload):
+        if isinstance(payload, bytes) and payload.startswith(_COMPRESSED):
+            payload = zlib.decompress(payload[len(_COMPRESSED):])
+        return super().decode(payload)
+
+
+def task_meta(backend: RedisBackend, task_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Reads the stored state of each task in one round trip. Unknown ids (never
+    sent, expired, or ignore_result tasks) are PENDING, as with AsyncResult.
+    Failed tasks report the exception as a string.
+    """
+    values = backend.mget([backend.get_key_for_task(task_id) for task_id in task_ids])
+    metas = []
+    for task_id, value in zip(task_ids, values):
+        meta = backend.decode_result(value) if value else {"status": states.PENDING, "result": None}
+        status = meta["status"]
+        result = meta.get("result")
+        entry = {"task_id": task_id, "status": status, "date_done": meta.get("date_done")}
+        if status in states.EXCEPTION_STATES:
+            entry["error"] = repr(result)
+        else:
+            entry["result"] = result
+        metas.append(entry)
+    return metas
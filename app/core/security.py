@@ -4,6 +4,7 @@ app/core/security.py
 This module handles cryptographic operations:
 1. Password hashing/verification using bcrypt.
 2. JWT (JSON Web Token) creation for authentication.
+3. A bounded worker pool that runs password hashing off the request threadpool.
 
 Security best practices:
 - Never store plain text passwords.
@@ -11,11 +12,15 @@ Security best practices:
 - JWTs should have an expiration time to limit the window of opportunity for stolen tokens.
 """
 
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Callable, Dict, TypeVar, Union, Optional
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_QUEUED, PASSWORD_HASH_REJECTED, PASSWORD_HASH_RUNNING
 
 # Setup password hashing context
 # 'bcrypt' is the hashing algorithm.
@@ -60,3 +65,97 @@ def get_password_hash(password: str) -> str:
     Use this when registering a new user.
     """
     return pwd_context.hash(password)
+
+
+T = TypeVar("T")
+
+class PasswordHashPoolSaturated(Exception):
+    """
+    Raised when too many hashes are already waiting for a worker.
+    """
+
+class PasswordHashPool:
+    """
+    Size-limited thread pool dedicated to argon2 work.
+
+    argon2 releases the GIL while hashing, so a few threads give real
+    parallelism, while the fixed worker count caps how much CPU a login
+    burst can take from the rest of the API. Jobs beyond `max_queue`
+    waiting jobs are rejected instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queued = 0
+        self.running = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="argon2")
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                PASSWORD_HASH_REJECTED.inc()
+                raise PasswordHashPoolSaturated()
+            self.queued += 1
+            PASSWORD_HASH_QUEUED.inc()
+
+        started = False
+
+        def call() -> T:
+            nonlocal started
+            with self._lock:
+                started = True
+                self.queued -= 1
+                self.running += 1
+                PASSWORD_HASH_QUEUED.dec()
+                PASSWORD_HASH_RUNNING.inc()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    PASSWORD_HASH_RUNNING.dec()
+
+        def on_done(future: Future) -> None:
+            # A job cancelled before it reached a worker still counts as queued
+            if not started:
+                with self._lock:
+                    self.queued -= 1
+                    PASSWORD_HASH_QUEUED.dec()
+
+        future = self._executor.submit(call)
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns queue depth and worker usage. The same numbers are exported
+        as the password_hash_* Prometheus metrics.
+        """
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "rejected": self.rejected,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+        }
+
+hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Async version of verify_password that runs on the hash pool.
+    """
+    return await hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Async version of get_password_hash that runs on the hash pool.
+    """
+    return await hash_pool.run(get_password_hash, password)
@@ -0,0 +1,104 @@
+"""
+app/core/task_batching.py
+
+Client-side batching for high-volume Celery submissions.
+
+TaskBatcher collects items enqueued by concurrent requests and sends them as
+one task call once it holds `max_items` items or the oldest item has waited
+`max_delay_ms`, whichever comes first. A burst of a thousand single-order
+requests then costs a handful of broker round trips instead of a thousand.
+Each caller gets back the id of the batch task that carries its item; the
+task's result in the result backend reports every item individually.
+
+The batch task must take the list of items as its only argument.
+"""
+
+import asyncio
+import logging
+from typing import Any, List, Optional, Tuple
+
+from celery import Task
+
+logger = logging.getLogger(__name__)
+
+# Every batcher created in this process, so the lifespan can flush them on shutdown
+batchers: List["TaskBatcher"] = []
+
+
+class TaskBatcher:
+
+    def __init__(self, task: Task, max_items: int, max_delay_ms: float) -> None:
+        self.task = task
+        self.max_items = max_items
+        self.max_delay = max_delay_ms / 1000
+        self._items: List[Any] = []
+        self._waiters: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+        batchers.append(self)
+
+    async def add(self, item: Any) -> str:
+        """
+        Queues one item and returns the id of the batch task it was sent in.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._items.append(item)
+        self._waiters.append(waiter)
+        if len(self._items) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await waiter
+
+    async def submit_many(self, items: List[Any]) -> List[Tuple[str, List[Any]]]:
+        """
+        Sends already-collected items straight away in chunks of `max_items`,
+        concurrently. Returns (batch task id, chunk) pairs.
+        """
+        chunks = [items[i:i + self.max_items] for i in range(0, len(items), self.max_items)]
+        task_ids = await asyncio.gather(*(self._send(chunk) for chunk in chunks))
+        return list(zip(task_ids, chunks))
+
+    async def drain(self) -> None:
+        """
+        Sends whatever is still buffered and waits for in-flight sends.
+        """
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._items:
+            return
+        items, waiters = self._items, self._waiters
+        self._items, self._waiters = [], []
+        dispatch = asyncio.ensure_future(self._dispatch(items, waiters))
+        self._inflight.add(dispatch)
+        dispatch.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, items: List[Any], waiters: List[asyncio.Future]) -> None:
+        try:
+            task_id = await self._send(items)
+        except Exception as exc:
+            logger.exception("Failed to enqueue a batch of %d for %s", len(items), self.task.name)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(task_id)
+
+    async def _send(self, items: List[Any]) -> str:
+        # Publishing is a blocking broker call; keep it off the event loop
+        result = await asyncio.to_thread(self.task.delay, items)
+        return result.id
+
+
+async def drain_all() -> None:
+    for batcher in batchers:
+        await batcher.drain()
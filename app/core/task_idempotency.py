@@ -0,0 +1,167 @@
+"""
+app/core/task_idempotency.py
+
+Idempotent Celery tasks backed by the result-backend Redis.
+
+`idempotent_task` wraps a bound task so each logical job (identified by a
+key built from the task arguments) runs at most once per result TTL:
+
+- The first worker to see the key takes a lock with a lease. If it crashes,
+  the lease runs out and a redelivered or retried task can run the job.
+- On success the return value is stored for TASK_IDEMPOTENCY_RESULT_TTL_SECONDS
+  and the lock is dropped; duplicates get the stored result back without
+  running the job.
+- On failure the lock is released straight away, so Celery retries (or a
+  resubmission) can run the job again.
+- A duplicate that arrives while the job is running is retried after
+  TASK_IDEMPOTENCY_RETRY_SECONDS and then picks up the stored result. It
+  keeps retrying for as long as the lease (plus one retry), not the task's
+  max_retries: by then the job has finished or its lease has run out.
+
+Every key carries an expiry, so Redis memory is bounded by the number of
+jobs seen within one result TTL. Results must be JSON-serializable.
+"""
+
+import functools
+import json
+import logging
+import math
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from celery import Task
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS: result key, lock key. ARGV: lock token, lease (ms).
+# Returns {"done", result} | {"locked"} | {"acquired"}; the result check and
+# the lock are one atomic step, so a job finishing in between can't rerun.
+_ACQUIRE_SCRIPT = """
+local result = redis.call('GET', KEYS[1])
+if result then
+    return {'done', result}
+end
+if redis.call('SET', KEYS[2], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return {'acquired'}
+end
+return {'locked'}
+"""
+
+# KEYS: result key, lock key. ARGV: lock token, result (empty to just
+# release), result TTL (ms). Only the lock holder may store and release.
+_FINISH_SCRIPT = """
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] ~= '' then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+end
+return redis.call('DEL', KEYS[2])
+"""
+
+
+# Marker for JobLocks.finish: unlock the job without storing a result
+RELEASE = object()
+
+
+class JobLocks:
+    """
+    Pipelined access to the job locks and stored results: checking or
+    finishing any number of jobs costs one Redis round trip.
+
+    acquire() returns one (state, result) pair per job, where state is
+    "acquired", "locked" or "done" (result holds the stored value).
+    """
+
+    def __init__(
+        self,
+        client,
+        prefix: str = "idempotency:task",
+        lease: Optional[float] = None,
+        result_ttl: Optional[float] = None,
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.lease_ms = int((lease or settings.TASK_IDEMPOTENCY_LEASE_SECONDS) * 1000)
+        self.result_ttl_ms = int((result_ttl or settings.TASK_IDEMPOTENCY_RESULT_TTL_SECONDS) * 1000)
+        self.token = uuid.uuid4().hex
+
+    def _keys(self, job: str) -> List[str]:
+        return [f"{self.prefix}:{job}:result", f"{self.prefix}:{job}:lock"]
+
+    def acquire(self, jobs: Sequence[str]) -> List[Tuple[str, Any]]:
+        pipe = self.client.pipeline(transaction=False)
+        for job in jobs:
+            pipe.eval(_ACQUIRE_SCRIPT, 2, *self._keys(job), self.token, self.lease_ms)
+        outcomes = []
+        for outcome in pipe.execute():
+            state = outcome[0].decode() if isinstance(outcome[0], bytes) else outcome[0]
+            outcomes.append((state, json.loads(outcome[1]) if state == "done" else None))
+        return outcomes
+
+    def finish(self, results: Dict[str, Any]) -> None:
+        """
+        Stores the result of each succeeded job and releases its lock. Jobs
+        mapped to RELEASE are only unlocked, so they can run again.
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for job, result in results.items():
+            value = "" if result is RELEASE else json.dumps(result)
+            pipe.eval(_FINISH_SCRIPT, 2, *self._keys(job), self.token, value, self.result_ttl_ms)
+        pipe.execute()
+
+
+def _backend_client(task: Task):
+    # The Redis result backend's (sync) client; reuses its connection pool
+    return task.backend.client
+
+
+def idempotent_task(
+    key: Callable[..., str],
+    lease: Optional[float] = None,
+    result_ttl: Optional[float] = None,
+    client: Callable[[Task], Any] = _backend_client,
+    prefix: str = "idempotency:task",
+) -> Callable:
+    """
+    Decorator for bound tasks (`@celery_app.task(bind=True)` on top).
+
+    Args:
+        key: Builds the job key from the task's arguments (without `self`).
+        lease: Lock lifetime in seconds; must exceed the job's run time.
+        result_ttl: How long the stored result is handed to duplicates.
+        client: Returns the Redis client to use for a task instance.
+    """
+
+    def decorator(fun: Callable) -> Callable:
+
+        @functools.wraps(fun)
+        def wrapper(self: Task, *args, **kwargs):
+            job = key(*args, **kwargs)
+            locks = JobLocks(client(self), prefix, lease, result_ttl)
+
+            [(state, stored)] = locks.acquire([job])
+            if state == "done":
+                logger.info("Duplicate %s for %s, returning stored result", self.name, job)
+                return stored
+            if state == "locked":
+                logger.info("%s for %s is already running, retrying later", self.name, job)
+                retry_seconds = settings.TASK_IDEMPOTENCY_RETRY_SECONDS
+                raise self.retry(
+                    countdown=retry_seconds,
+                    max_retries=math.ceil(locks.lease_ms / 1000 / retry_seconds) + 1,
+                )
+
+            try:
+                result = fun(self, *args, **kwargs)
+            except BaseException:
+                locks.finish({job: RELEASE})
+                raise
+            locks.finish({job: result})
+            return result
+
+        return wrapper
+
+    return decorator
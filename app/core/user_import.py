@@ -0,0 +1,95 @@
+"""
+app/core/user_import.py
+
+Bulk user creation shared by POST /users/bulk and the import_users Celery
+task.
+
+Imports that hash at most USER_BULK_MAX_ROWS passwords run inside the
+request. Larger ones are validated in the request, then split into chunks of
+USER_BULK_JOB_CHUNK_ROWS and created by import_users tasks on the "cpu"
+queue, so argon2 runs on worker processes instead of the API's hash pool.
+Each task reports its rows by their index in the original request.
+
+Batches commit one by one. If a batch fails, the rows already created stay
+"created" and the rest are reported "failed", so callers know exactly which
+rows to send again; resent rows that did get created report "duplicate".
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from app.core import security
+from app.core.config import settings
+from app.models.user import User
+from app.schemas import user as user_schema
+
+
+def insert_ignoring_duplicates(dialect_name: str):
+    # Emails that slipped in since the duplicate check are skipped, not fatal
+    if dialect_name == "postgresql":
+        return postgresql.insert(User).on_conflict_do_nothing(index_elements=["email"])
+    if dialect_name == "sqlite":
+        return sqlite.insert(User).on_conflict_do_nothing(index_elements=["email"])
+    return insert(User)
+
+
+def job_row(index: int, user_in: user_schema.UserCreate) -> Dict[str, Any]:
+    """
+    A validated row as sent to import_users (JSON-serializable).
+    """
+    return {"index": index, **user_in.model_dump()}
+
+
+def create_users(db: Session, rows: List[Dict[str, Any]]) -> List[user_schema.UserBulkResult]:
+    """
+    Creates validated job rows with a sync session, hashing in this process.
+    """
+    insert_statement = insert_ignoring_duplicates(db.bind.dialect.name).returning(User.id, User.email)
+    results: List[user_schema.UserBulkResult] = []
+
+    for start in range(0, len(rows), settings.USER_BULK_BATCH_SIZE):
+        batch = rows[start : start + settings.USER_BULK_BATCH_SIZE]
+        try:
+            statement = select(User.email).where(User.email.in_([row["email"] for row in batch]))
+            existing = set(db.exec(statement).all())
+            params = [
+                {
+                    "email": row["email"],
+                    "hashed_password": security.get_password_hash(row["password"]),
+                    "full_name": row.get("full_name"),
+                    "is_active": True,
+                    "is_superuser": False,
+                }
+                for row in batch
+                if row["email"] not in existing
+            ]
+            created = {}
+            if params:
+                result = db.exec(insert_statement, params=params)
+                created = {email: user_id for user_id, email in result.all()}
+                db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            results.extend(
+                user_schema.UserBulkResult(
+                    index=row["index"], status="failed", email=row["email"],
+                    detail="Database error; not created, retry this row",
+                )
+                for row in rows[start:]
+            )
+            break
+
+        for row in batch:
+            if row["email"] in created:
+                results.append(user_schema.UserBulkResult(
+                    index=row["index"], status="created", email=row["email"], id=created[row["email"]]
+                ))
+            else:
+                results.append(user_schema.UserBulkResult(
+                    index=row["index"], status="duplicate", email=row["email"], detail="Email already registered"
+                ))
+    return results
@@ -1,14 +1,32 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.db.pool import engine_options
 
 # Create the Database Engine
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI, 
-    pool_pre_ping=True,
-    echo=False
+    echo=False,
+    **engine_options()
 )
+instrument_engine(engine, "sync")
 
 # Create a Session Factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=Session)
 
+# Async Engine (asyncpg) for endpoints that run on the event loop instead of the threadpool
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    echo=False,
+    **engine_options(use_async=True)
+)
+instrument_engine(async_engine.sync_engine, "async")
+
+# Async Session Factory
+# expire_on_commit=False: attributes can't be lazy-loaded after commit in async code
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
@@ -1,19 +1,62 @@
 
+import logging
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.security import PasswordHashPoolSaturated
+from app.db.session import async_engine
 
 
 
-from app.core.middleware import LogRequestMiddleware, RequestIDMiddleware
+from app.core.access_log import access_log
+from app.core.cache_invalidation import cache_invalidator
+from app.core.compression import CompressionMiddleware
+from app.core.idempotency import REPLAYED_HEADER, IdempotencyMiddleware
+from app.core.metrics import metrics_endpoint
+from app.core.openapi import install as install_openapi, openapi_document
+from app.core.rate_limit import rate_limiter
+from app.core.task_batching import drain_all as drain_task_batchers
+from app.core import redis_client
+from app.core.middleware import LogRequestMiddleware, PrometheusMiddleware, RequestIDMiddleware
+
+logging.basicConfig(level=logging.INFO)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    access_log.start()
+    app.state.redis = redis_client.create_redis()
+    # A down Redis shouldn't stop the API; dependent features degrade instead
+    await redis_client.ping(app.state.redis)
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        rate_limiter.bind(app.state.redis)
+    # Cache evictions in one worker reach the others over pub/sub
+    cache_invalidator.start(app.state.redis)
+    if settings.OPENAPI_PRECOMPUTE:
+        # Pay for schema generation before the first request, not during it
+        openapi_document.load(app)
+    yield
+    # Don't drop orders still waiting for their batch
+    await drain_task_batchers()
+    rate_limiter.bind(None)
+    await cache_invalidator.stop()
+    await redis_client.close(app.state.redis)
+    await async_engine.dispose()
+    # Flush queued access log records before the worker exits
+    access_log.stop()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # orjson encodes response_model output several times faster than json.dumps
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 if settings.BACKEND_CORS_ORIGINS:
@@ -23,6 +66,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", REPLAYED_HEADER],
     )
 
 # Include the main API router
@@ -31,9 +75,38 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
 
+if settings.IDEMPOTENCY_ENABLED:
+    # Inside compression, so stored bodies are uncompressed and each replay
+    # is encoded for the retrying client
+    app.add_middleware(
+        IdempotencyMiddleware,
+        methods=settings.IDEMPOTENCY_METHODS,
+        paths=settings.IDEMPOTENCY_PATHS,
+    )
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        excluded_content_types=settings.COMPRESSION_EXCLUDED_CONTENT_TYPES,
+        cache_paths=settings.COMPRESSION_CACHE_PATHS,
+    )
+app.add_middleware(PrometheusMiddleware)
 app.add_middleware(LogRequestMiddleware)
 app.add_middleware(RequestIDMiddleware)
 
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+if settings.OPENAPI_PRECOMPUTE:
+    install_openapi(app)
+
+@app.exception_handler(PasswordHashPoolSaturated)
+async def password_hash_pool_saturated_handler(request: Request, exc: PasswordHashPoolSaturated):
+    # Shed load instead of queueing more argon2 work behind a login burst
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
 @app.get("/")
 def root():
     
@@ -0,0 +1,14 @@
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class ItemBase(SQLModel):
+    title: str
+    description: Optional[str] = None
+
+class Item(ItemBase, table=True):
+    # Listing a user's items is a range scan on (owner_id, id)
+    __table_args__ = (Index("ix_item_owner_id_id", "owner_id", "id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    owner_id: int = Field(foreign_key="user.id")
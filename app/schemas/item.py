@@ -1,5 +1,5 @@
 
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 
 
@@ -26,3 +26,21 @@ class ItemInDBBase(ItemBase):
 # Properties to return to client
 class Item(ItemInDBBase):
     pass
+
+# One operation in a batch request; `id` is required for update/delete,
+# `data` (with a title) for create
+class ItemBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None
+    data: Optional[ItemUpdate] = None
+
+class ItemBatchRequest(BaseModel):
+    operations: List[ItemBatchOperation]
+
+# Per-operation outcome, with an HTTP-style status code
+class ItemBatchResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    item: Optional[Item] = None
+    detail: Optional[str] = None
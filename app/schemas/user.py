@@ -1,6 +1,6 @@
 
 
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, EmailStr
 
 # Shared properties
@@ -37,3 +37,19 @@ class User(UserInDBBase):
 # Additional properties stored in DB
 class UserInDB(UserInDBBase):
     hashed_password: str
+
+# Per-row outcome of a bulk import
+class UserBulkResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "invalid", "failed"]
+    email: Optional[str] = None
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+# A bulk import too large to run inside the request
+class UserBulkJob(BaseModel):
+    # Rows handed to import_users tasks; their results are the task results
+    queued: int
+    task_ids: List[str]
+    # Rows already rejected in the request (invalid or repeated)
+    results: List[UserBulkResult]
@@ -1,7 +1,15 @@
 import time
 import random
+from typing import Any, Dict, List
 from celery import Task
 from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.metrics import instrument_celery
+from app.core.task_idempotency import RELEASE, JobLocks, idempotent_task
+from app.core.user_import import create_users
+from app.db.session import SessionLocal
+
+instrument_celery()
 
 @celery_app.task(acks_late=True)
 def long_running_task(word: str) -> str:
@@ -29,29 +37,69 @@ def task_with_retry(self, input_data: str):
     
     return f"Success: {input_data}"
 
-@celery_app.task
+@celery_app.task(ignore_result=True)
 def scheduled_task_demo():
     print("CRON JOB EXECUTED: I run every minute!")
 
 @celery_app.task(bind=True)
+@idempotent_task(key=lambda order_id: f"order:{order_id}")
 def process_order(self, order_id: str):
     """
-    Idempotent task: Processes an order ONLY if it hasn't been processed before.
-    Uses Redis atomic 'setnx' (Set if Not eXists).
-    """
-    # Access the Redis client from the Celery backend
-    # This works because we are using Redis as the result backend
-    redis_client = self.backend.client
-
-    key = f"order:{order_id}:processed"
-
-    # Try to set the key. Returns True if set, False if already existed.
-    if redis_client.setnx(key, "1"):
-        # We acquired the lock -> Process the order
-        print(f"PROCESSING ORDER: {order_id}...")
-        time.sleep(4) # Simulate payment processing
-        return f"Order {order_id} Processed Successfully"
-    else:
-        # Lock failed -> Already processed
-        print(f"IGNORING ORDER: {order_id} (Duplicate Received)")
-        return f"Order {order_id} Skipped (Idempotent)"
+    Idempotent task: processes an order at most once per result TTL.
+    Duplicates get the stored result back; a failure releases the order so it
+    can be retried (see app/core/task_idempotency.py).
+    """
+    print(f"PROCESSING ORDER: {order_id}...")
+    time.sleep(4) # Simulate payment processing
+    return f"Order {order_id} Processed Successfully"
+
+@celery_app.task(bind=True, result_expires=settings.ORDER_BATCH_RESULT_EXPIRES_SECONDS)
+def process_order_batch(self, order_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Processes a chunk of orders in one task. The idempotency checks for the
+    whole chunk are one pipelined Redis round trip, and so are the result
+    writes. Shares its keys with process_order, so an order is processed once
+    whichever task it arrives through.
+
+    The task result reports each order: "processed", "duplicate" (with the
+    stored result), "in_progress" (another worker holds it) or "failed".
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    locks = JobLocks(self.backend.client)
+    jobs = {order_id: f"order:{order_id}" for order_id in order_ids}
+
+    report: Dict[str, Dict[str, Any]] = {}
+    to_process = []
+    for order_id, (state, stored) in zip(order_ids, locks.acquire(list(jobs.values()))):
+        if state == "done":
+            report[order_id] = {"status": "duplicate", "result": stored}
+        elif state == "locked":
+            report[order_id] = {"status": "in_progress"}
+        else:
+            to_process.append(order_id)
+
+    if to_process:
+        print(f"PROCESSING {len(to_process)} ORDERS IN ONE BATCH...")
+        try:
+            time.sleep(4) # Simulate one bulk payment call for the chunk
+            results = {order_id: f"Order {order_id} Processed Successfully" for order_id in to_process}
+        except Exception as exc:
+            # Release the orders so a resubmission can process them
+            locks.finish({jobs[order_id]: RELEASE for order_id in to_process})
+            report.update({order_id: {"status": "failed", "error": str(exc)} for order_id in to_process})
+        else:
+            locks.finish({jobs[order_id]: result for order_id, result in results.items()})
+            report.update({order_id: {"status": "processed", "result": result} for order_id, result in results.items()})
+
+    return {order_id: report[order_id] for order_id in order_ids}
+
+@celery_app.task(acks_late=True)
+def import_users(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Creates one chunk of a large POST /users/bulk import (see
+    app/core/user_import.py). Rows carry their index in the original request;
+    the result has one entry per row. A redelivered chunk reports the rows it
+    already created as duplicates.
+    """
+    with SessionLocal() as db:
+        return [result.model_dump() for result in create_users(db, rows)]
@@ -0,0 +1,112 @@
+"""
+benchmarks/bench_celery_profiles.py
+
+Throughput and tail latency of the worker profiles in app/core/celery_app.py
+(WORKER_PROFILES) on an I/O-bound and a CPU-bound workload. Each profile's
+concurrency and prefetch settings are applied to a worker started in-process;
+a burst of acks_late tasks is sent and each task's latency (sent -> finished)
+is recorded.
+
+Runs against Celery's in-memory broker by default, so every profile uses the
+threads pool (prefork children can't see an in-process broker). Set
+BENCH_REDIS_URL to go through a real Redis broker and result backend; each
+profile then runs on its own worker_pool, with worker_max_tasks_per_child
+where it sets one:
+    BENCH_REDIS_URL=redis://localhost:6379/15 python -m benchmarks.bench_celery_profiles
+"""
+
+import hashlib
+import os
+import statistics
+import time
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from kombu.transport import memory
+
+from app.core.celery_app import WORKER_PROFILES
+
+TASKS = int(os.environ.get("BENCH_TASKS", 400))
+IO_WAIT = 0.02
+CPU_ROUNDS = 20_000
+
+
+class MemoryTransport(memory.Transport):
+    """
+    Celery runs deferred acks between drains, and its blocking loop (used for
+    transports without an event loop, like this one) drains for up to 2s. On
+    Redis the event loop acks at once; wait in short slices so acks_late
+    slots refill as promptly here.
+    """
+
+    polling_interval = 0.001
+
+    def drain_events(self, connection, timeout=None):
+        return super().drain_events(connection, timeout=0.005)
+
+
+def make_app(profile: dict) -> Celery:
+    url = os.environ.get("BENCH_REDIS_URL")
+    bench = Celery("bench", broker=url or "memory://", backend=url or "cache+memory://")
+    if not url:
+        bench.conf.broker_transport = MemoryTransport
+    bench.conf.update(
+        task_acks_late=True,
+        worker_concurrency=profile["worker_concurrency"],
+        worker_prefetch_multiplier=profile["worker_prefetch_multiplier"],
+    )
+
+    @bench.task(name="bench.io")
+    def io_task():
+        time.sleep(IO_WAIT)
+        return time.time()
+
+    @bench.task(name="bench.cpu")
+    def cpu_task():
+        digest = b""
+        for _ in range(CPU_ROUNDS):
+            digest = hashlib.sha256(digest).digest()
+        return time.time()
+
+    return bench
+
+
+def worker_pool(profile: dict) -> str:
+    return profile["worker_pool"] if os.environ.get("BENCH_REDIS_URL") else "threads"
+
+
+def run(profile: dict, workload: str) -> tuple:
+    bench = make_app(profile)
+    task = bench.tasks[f"bench.{workload}"]
+    with start_worker(
+        bench,
+        pool=worker_pool(profile),
+        concurrency=profile["worker_concurrency"],
+        max_tasks_per_child=profile.get("worker_max_tasks_per_child"),
+        perform_ping_check=False,
+        shutdown_timeout=30,
+    ):
+        started = time.time()
+        sent = [(time.time(), task.delay()) for _ in range(TASKS)]
+        finished = [(result.get(timeout=120), queued) for queued, result in sent]
+    latencies = sorted(done - queued for done, queued in finished)
+    elapsed = max(done for done, _ in finished) - started
+    quantiles = statistics.quantiles(latencies, n=100)
+    return TASKS / elapsed, quantiles[49], quantiles[94], quantiles[98]
+
+
+def main() -> None:
+    print(f"{TASKS} tasks per run, {os.cpu_count()} CPU(s), broker: {os.environ.get('BENCH_REDIS_URL') or 'memory://'}")
+    print(f"{'profile':<8} {'workload':<9} {'pool':<8} {'conc':>5} {'prefetch':>9} {'tasks/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, profile in WORKER_PROFILES.items():
+        for workload in ("io", "cpu"):
+            rate, p50, p95, p99 = run(profile, workload)
+            print(
+                f"{name:<8} {workload:<9} {worker_pool(profile):<8} {profile['worker_concurrency']:>5} "
+                f"{profile['worker_prefetch_multiplier']:>9} {rate:>9.1f} "
+                f"{p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {p99 * 1000:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
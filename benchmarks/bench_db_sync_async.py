@@ -0,0 +1,103 @@
+"""
+benchmarks/bench_db_sync_async.py
+
+Compares primary-key lookup throughput of the sync Session stack (run through
+a 40-thread limiter, like Starlette's threadpool) against the AsyncSession
+stack (run directly on the event loop) at the same concurrency.
+
+Uses a throwaway SQLite file by default (needs aiosqlite installed). Point it
+at Postgres to get meaningful numbers:
+    BENCH_DATABASE_URI=postgresql://postgres:@localhost:5432/bench_db \\
+        python -m benchmarks.bench_db_sync_async
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import anyio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.user import User
+
+USERS = 1_000
+REQUESTS = 5_000
+CONCURRENCY = 500
+THREADPOOL_SIZE = 40  # Starlette/anyio default
+
+
+def database_uris() -> tuple:
+    uri = os.environ.get("BENCH_DATABASE_URI")
+    if not uri:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        return f"sqlite:///{path}", f"sqlite+aiosqlite:///{path}"
+    return uri, uri.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+def seed(engine) -> None:
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(
+            User(email=f"user{i}@example.com", hashed_password="x") for i in range(USERS)
+        )
+        db.commit()
+
+
+async def run_sync(SessionLocal) -> float:
+    limiter = anyio.CapacityLimiter(THREADPOOL_SIZE)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    def lookup(user_id: int) -> None:
+        with SessionLocal() as db:
+            db.get(User, user_id)
+
+    async def request(i: int) -> None:
+        async with semaphore:
+            await anyio.to_thread.run_sync(lookup, i % USERS + 1, limiter=limiter)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(i) for i in range(REQUESTS)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def run_async(AsyncSessionLocal) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def request(i: int) -> None:
+        async with semaphore:
+            async with AsyncSessionLocal() as db:
+                await db.get(User, i % USERS + 1)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(i) for i in range(REQUESTS)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    sync_uri, async_uri = database_uris()
+    pool_options = {"pool_size": THREADPOOL_SIZE, "max_overflow": 0} if "postgresql" in sync_uri else {}
+
+    engine = create_engine(sync_uri, **pool_options)
+    seed(engine)
+    async_engine = create_async_engine(async_uri, **pool_options)
+
+    SessionLocal = sessionmaker(bind=engine, class_=Session)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    sync_rps = await run_sync(SessionLocal)
+    async_rps = await run_async(AsyncSessionLocal)
+    print(f"{REQUESTS} lookups, {CONCURRENCY} concurrent, {sync_uri.split(':')[0]}")
+    print(f"sync  (threadpool) {sync_rps:>10,.0f} req/s")
+    print(f"async (event loop) {async_rps:>10,.0f} req/s")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
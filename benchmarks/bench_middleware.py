@@ -0,0 +1,138 @@
+"""
+benchmarks/bench_middleware.py
+
+Measures the per-request overhead of the RequestID/LogRequest middleware pair.
+"legacy" is the previous BaseHTTPMiddleware implementation, "asgi" is the
+current one in app/core/middleware.py. Requests are driven straight through
+the ASGI interface so only the middleware cost is measured.
+
+Run from the project root:
+    python -m benchmarks.bench_middleware
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.access_log import access_log
+from app.core.middleware import LogRequestMiddleware, RequestIDMiddleware
+
+REQUESTS = 5_000
+
+# The old middlewares logged through the standard logging module
+logger = logging.getLogger("bench.legacy_middleware")
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacyLogRequestMiddleware(BaseHTTPMiddleware):
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = (time.time() - start_time) * 1000
+        request_id = getattr(request.state, "request_id", "limitless")
+        logger.info(
+            f"id={request_id} "
+            f"method={request.method} "
+            f"path={request.url.path} "
+            f"status={response.status_code} "
+            f"duration={process_time:.2f}ms"
+        )
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+def build_app(*middlewares) -> Starlette:
+    async def ping(request: Request) -> PlainTextResponse:
+        return PlainTextResponse("pong")
+
+    app = Starlette(routes=[Route("/ping", ping)])
+    for middleware in middlewares:
+        app.add_middleware(middleware)
+    return app
+
+
+async def drive(app: Starlette) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    disconnected = asyncio.Event()
+
+    def make_receive():
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Like a real server: block until the client goes away
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        return receive
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter_ns()
+    for _ in range(REQUESTS):
+        await app(dict(scope), make_receive(), send)
+    return (time.perf_counter_ns() - start) / REQUESTS / 1000
+
+
+async def main() -> None:
+    # Both variants write every record to /dev/null so the sink cost is comparable
+    devnull = open(os.devnull, "w")
+    logger.handlers = [logging.StreamHandler(devnull)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    access_log.stream = devnull
+
+    apps = {
+        "bare": build_app(),
+        "legacy": build_app(LegacyLogRequestMiddleware, LegacyRequestIDMiddleware),
+        "asgi": build_app(LogRequestMiddleware, RequestIDMiddleware),
+    }
+    for app in apps.values():
+        await drive(app)  # warm up
+
+    baseline = await drive(apps["bare"])
+    print(f"{'bare':<8} {baseline:8.1f} us/request")
+    for label in ("legacy", "asgi"):
+        per_request = await drive(apps[label])
+        print(f"{label:<8} {per_request:8.1f} us/request  (+{per_request - baseline:.1f} us middleware overhead)")
+    access_log.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+benchmarks/bench_pagination.py
+
+Compares OFFSET pagination with keyset (cursor) pagination on a table with
+one million rows. Offset latency grows with page depth; keyset latency stays
+flat because each page is an index range scan starting at the last seen id.
+
+Uses the standard library sqlite3 module so it runs anywhere:
+    python -m benchmarks.bench_pagination
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+
+ROWS = 1_000_000
+PAGE_SIZE = 100
+PAGES = (0, 100, 1_000, 5_000, 9_999)
+REPEAT = 20
+
+
+def seed(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        'CREATE TABLE "user" (id INTEGER PRIMARY KEY, email TEXT NOT NULL UNIQUE, '
+        "is_active BOOLEAN NOT NULL, is_superuser BOOLEAN NOT NULL, "
+        "full_name TEXT, hashed_password TEXT NOT NULL)"
+    )
+    conn.executemany(
+        'INSERT INTO "user" (id, email, is_active, is_superuser, full_name, hashed_password) '
+        "VALUES (?, ?, 1, 0, NULL, 'x')",
+        ((i, f"user{i}@example.com") for i in range(1, ROWS + 1)),
+    )
+    conn.commit()
+
+
+def timed(conn: sqlite3.Connection, sql: str, params: tuple) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main() -> None:
+    path = os.path.join(tempfile.mkdtemp(), "pagination.db")
+    conn = sqlite3.connect(path)
+    print(f"seeding {ROWS:,} rows...")
+    seed(conn)
+
+    offset_sql = 'SELECT * FROM "user" ORDER BY id LIMIT ? OFFSET ?'
+    keyset_sql = 'SELECT * FROM "user" WHERE id > ? ORDER BY id LIMIT ?'
+
+    print(f"{'page':>6} {'offset ms':>10} {'keyset ms':>10}")
+    for page in PAGES:
+        skip = page * PAGE_SIZE
+        # With sequential ids the cursor for page N is the id of the row before it
+        last_id = skip
+        offset_ms = timed(conn, offset_sql, (PAGE_SIZE, skip))
+        keyset_ms = timed(conn, keyset_sql, (last_id, PAGE_SIZE))
+        print(f"{page:>6} {offset_ms:>10.3f} {keyset_ms:>10.3f}")
+
+    conn.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+benchmarks/bench_serialization.py
+
+Serialization throughput for a 1000-element user list, measured through real
+FastAPI routes driven over ASGI (no network, no database):
+
+    json         response_model + JSONResponse (FastAPI's default)
+    orjson       response_model + ORJSONResponse (the app's default class)
+    typeadapter  app.core.responses.model_response, bypassing response_model
+    trusted      model_response(trusted=True), which also skips validators
+                 such as EmailStr for rows read from the database
+
+Run from the project root (needs orjson):
+    python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import json
+import time
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.core.responses import model_response
+from app.models.user import User
+from app.schemas import user as user_schema
+
+USERS = 1_000
+REQUESTS = 300
+
+
+def build_app(users: List[User]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/json", response_model=List[user_schema.User], response_class=JSONResponse)
+    async def as_json():
+        return users
+
+    @app.get("/orjson", response_model=List[user_schema.User], response_class=ORJSONResponse)
+    async def as_orjson():
+        return users
+
+    @app.get("/typeadapter", response_model=List[user_schema.User])
+    async def as_typeadapter():
+        return model_response(List[user_schema.User], users)
+
+    @app.get("/trusted", response_model=List[user_schema.User])
+    async def as_trusted():
+        return model_response(List[user_schema.User], users, trusted=True)
+
+    return app
+
+
+async def drive(app: FastAPI, path: str) -> tuple:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        body.clear()
+        await app(dict(scope), receive, send)
+    elapsed = time.perf_counter() - start
+    return REQUESTS / elapsed, bytes(body)
+
+
+async def main() -> None:
+    users = [
+        User(id=i, email=f"user{i}@example.com", full_name=f"User {i}", hashed_password="x")
+        for i in range(1, USERS + 1)
+    ]
+    app = build_app(users)
+
+    print(f"{USERS}-user list, {REQUESTS} requests per variant")
+    bodies = {}
+    baseline = None
+    for variant in ("json", "orjson", "typeadapter", "trusted"):
+        await drive(app, f"/{variant}")  # warm up
+        rps, bodies[variant] = await drive(app, f"/{variant}")
+        baseline = baseline or rps
+        print(f"{variant:<12} {rps:>8,.0f} lists/s  {rps * USERS:>12,.0f} users/s  ({rps / baseline:.1f}x)")
+
+    # The JSON spacing may differ between encoders, the data must not
+    assert len({json.dumps(json.loads(body)) for body in bodies.values()}) == 1
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+benchmarks/bench_startup.py
+
+Measures worker startup cost for app.main:app: module import time, lifespan
+startup time, and the latency of the first and second requests to the
+OpenAPI URL. Each sample runs in a fresh interpreter so imports are cold.
+
+Modes:
+    lazy        OPENAPI_PRECOMPUTE=false (FastAPI builds the schema on first request)
+    precompute  schema generated during lifespan startup
+    artifact    schema loaded from a file written by `python -m app.core.openapi`
+
+Run from the project root (needs httpx for the TestClient):
+    python -m benchmarks.bench_startup
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 5
+
+
+def child() -> None:
+    start = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    from fastapi.testclient import TestClient
+
+    from app.core.config import settings
+
+    url = f"{settings.API_V1_STR}/openapi.json"
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        client.get(url)
+        first = time.perf_counter()
+        client.get(url)
+        second = time.perf_counter()
+
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "startup_ms": (started - imported) * 1000,
+        "first_ms": (first - started) * 1000,
+        "second_ms": (second - first) * 1000,
+    }))
+
+
+def sample(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    workdir = tempfile.mkdtemp()
+    base_env = dict(
+        os.environ,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        ACCESS_LOG_ENABLED="false",
+    )
+    artifact = os.path.join(workdir, "openapi.json")
+    subprocess.run(
+        [sys.executable, "-m", "app.core.openapi", artifact],
+        env=base_env, capture_output=True, check=True,
+    )
+
+    modes = {
+        "lazy": {"OPENAPI_PRECOMPUTE": "false"},
+        "precompute": {"OPENAPI_PRECOMPUTE": "true"},
+        "artifact": {"OPENAPI_PRECOMPUTE": "true", "OPENAPI_SCHEMA_FILE": artifact},
+    }
+    columns = ("import_ms", "startup_ms", "first_ms", "second_ms")
+    print(f"median of {RUNS} cold starts")
+    print(f"{'mode':<12}" + "".join(f"{column:>12}" for column in columns))
+    for mode, overrides in modes.items():
+        samples = [sample({**base_env, **overrides}) for _ in range(RUNS)]
+        medians = [statistics.median(s[column] for s in samples) for column in columns]
+        print(f"{mode:<12}" + "".join(f"{value:>12.2f}" for value in medians))
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child()
+    else:
+        main()
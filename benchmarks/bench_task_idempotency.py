@@ -0,0 +1,129 @@
+"""
+benchmarks/bench_task_idempotency.py
+
+Redis memory growth of Celery task idempotency: the old `process_order`
+marker (SETNX with no expiry) against app.core.task_idempotency with a short
+result TTL. Orders arrive in waves of new ids, each sent twice; after every
+wave the key count and stored bytes are sampled. The SETNX keys grow with
+every order ever seen, the TTL-bound keys level off at roughly one TTL's
+worth of orders.
+
+Also checks the behaviour that matters besides memory: duplicates get the
+stored result, a failed run releases the order so a retry can process it,
+and a duplicate of a running order stops retrying once the lease is over.
+
+Tasks run eagerly in-process. Uses fakeredis by default; set
+BENCH_REDIS_URL to measure a real Redis (used_memory is reported as well):
+    BENCH_REDIS_URL=redis://localhost:6379/15 python -m benchmarks.bench_task_idempotency
+"""
+
+import os
+import time
+
+import redis
+from celery import Celery
+
+from celery.exceptions import MaxRetriesExceededError
+
+from app.core.config import settings
+from app.core.task_idempotency import JobLocks, idempotent_task
+
+WAVES = 8
+ORDERS_PER_WAVE = 1_000
+RESULT_TTL = 5.0
+
+
+def make_client() -> redis.Redis:
+    url = os.environ.get("BENCH_REDIS_URL")
+    if url:
+        return redis.Redis.from_url(url)
+    import fakeredis
+
+    return fakeredis.FakeRedis()
+
+
+def stored_bytes(client: redis.Redis, pattern: str) -> tuple:
+    keys = values = 0
+    for key in client.scan_iter(match=pattern, count=1_000):
+        value = client.get(key)
+        if value is not None:
+            keys += 1
+            values += len(key) + len(value)
+    return keys, values
+
+
+def main() -> None:
+    client = make_client()
+    client.flushdb()
+
+    bench = Celery("bench")
+    bench.conf.task_always_eager = True
+    failures = {"fail-once": 1}
+
+    @bench.task(bind=True)
+    def legacy_order(self, order_id: str):
+        if client.setnx(f"order:{order_id}:processed", "1"):
+            return f"Order {order_id} Processed Successfully"
+        return f"Order {order_id} Skipped (Idempotent)"
+
+    @bench.task(bind=True)
+    @idempotent_task(
+        key=lambda order_id: f"order:{order_id}",
+        lease=30,
+        result_ttl=RESULT_TTL,
+        client=lambda task: client,
+    )
+    def ttl_order(self, order_id: str):
+        if failures.get(order_id):
+            failures[order_id] -= 1
+            raise RuntimeError("payment provider timeout")
+        return f"Order {order_id} Processed Successfully"
+
+    # Records the retry number of every attempt (eager results don't keep it)
+    attempts = []
+
+    @bench.task(bind=True)
+    @idempotent_task(
+        key=lambda order_id: f"order:{order_id}",
+        lease=30,
+        client=lambda task: attempts.append(task.request.retries) or client,
+        prefix="running",
+    )
+    def running_order(self, order_id: str):
+        return f"Order {order_id} Processed Successfully"
+
+    first = ttl_order.apply(args=("dup",)).get()
+    second = ttl_order.apply(args=("dup",)).get()
+    print(f"duplicate returns stored result: {first == second}")
+    failed = ttl_order.apply(args=("fail-once",))
+    retried = ttl_order.apply(args=("fail-once",))
+    print(f"failure releases the order: {failed.failed() and retried.successful()}")
+    JobLocks(client, prefix="running", lease=30).acquire(["order:running"])
+    waiting = running_order.apply(args=("running",))
+    expected = -(-30 // settings.TASK_IDEMPOTENCY_RETRY_SECONDS) + 1
+    print(
+        f"duplicate of a running order gives up after the lease ({expected} retries): "
+        f"{isinstance(waiting.result, MaxRetriesExceededError) and attempts[-1] == expected}"
+    )
+    client.flushdb()
+
+    print(f"\n{ORDERS_PER_WAVE} new orders per wave (each sent twice), result TTL {RESULT_TTL}s")
+    print(f"{'t (s)':>6} {'setnx keys':>11} {'setnx bytes':>12} {'ttl keys':>9} {'ttl bytes':>10}")
+    started = time.perf_counter()
+    for wave in range(WAVES):
+        for i in range(ORDERS_PER_WAVE):
+            order_id = f"{wave}-{i}"
+            for _ in range(2):
+                legacy_order.apply(args=(order_id,))
+                ttl_order.apply(args=(order_id,))
+        legacy = stored_bytes(client, "order:*")
+        ttl = stored_bytes(client, "idempotency:task:*")
+        elapsed = time.perf_counter() - started
+        print(f"{elapsed:>6.1f} {legacy[0]:>11,} {legacy[1]:>12,} {ttl[0]:>9,} {ttl[1]:>10,}")
+
+    if os.environ.get("BENCH_REDIS_URL"):
+        print(f"used_memory: {client.info('memory')['used_memory_human']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+benchmarks/bulk_users_harness.py
+
+End-to-end checks of POST /users/bulk on a throwaway SQLite database:
+
+- every row gets a result: created, duplicate or invalid
+- when a batch fails midway (here: the hash pool is saturated), rows from
+  earlier, committed batches stay "created" and every row that wasn't
+  committed is reported "failed", matching what is in the database
+- a retry of the failed rows creates them; the created ones report duplicate
+- above USER_BULK_MAX_ROWS the import is answered with 202 and created by
+  chunked import_users tasks (run eagerly here), which report per row
+
+Password hashing is replaced by a cheap stand-in so the run takes seconds.
+
+    python -m benchmarks.bulk_users_harness
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bulk.db')}"
+os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ["USER_BULK_BATCH_SIZE"] = "10"
+os.environ["USER_BULK_MAX_ROWS"] = "30"
+os.environ["USER_BULK_JOB_CHUNK_ROWS"] = "20"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel import Session, SQLModel, func, select  # noqa: E402
+
+import app.models.item  # noqa: E402,F401
+from app import worker  # noqa: E402
+from app.core import security  # noqa: E402
+from app.core.celery_app import celery_app  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.main import app as application  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+failures = []
+
+
+def check(label: str, condition: bool) -> None:
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+def user_count() -> int:
+    with Session(engine) as db:
+        return db.exec(select(func.count()).select_from(User)).one()
+
+
+def main() -> int:
+    SQLModel.metadata.create_all(engine)
+    real_hash = security.get_password_hash_async
+    real_sync_hash = security.get_password_hash
+    celery_app.conf.task_always_eager = True
+    hashes = {"left": None}
+
+    async def fake_hash(password: str) -> str:
+        if hashes["left"] is not None:
+            if hashes["left"] == 0:
+                raise security.PasswordHashPoolSaturated()
+            hashes["left"] -= 1
+        return f"fake${password}"
+
+    with TestClient(application) as client:
+        # The first user becomes the superuser
+        client.post("/api/v1/users/", json={"email": "admin@example.com", "password": "pw"})
+        client.post("/api/v1/login/access-token", json={"email": "admin@example.com", "password": "pw"})
+        security.get_password_hash_async = fake_hash
+        security.get_password_hash = lambda password: f"fake${password}"
+
+        rows = [{"email": f"user{i}@example.com", "password": "pw"} for i in range(25)]
+        rows += [{"email": "user0@example.com", "password": "pw"}, {"email": "broken"}]
+        before = user_count()
+        # Batches of 10: the first commits, the second fails on its 6th hash
+        hashes["left"] = 15
+        response = client.post("/api/v1/users/bulk", json=rows)
+        statuses = [result["status"] for result in response.json()]
+        check(f"partial failure still answers per row ({response.status_code})", response.status_code == 200)
+        check(
+            "committed batch is created, later rows failed",
+            statuses[:10] == ["created"] * 10 and statuses[10:25] == ["failed"] * 15,
+        )
+        check("request duplicate and invalid rows keep their status", statuses[25:] == ["duplicate", "invalid"])
+        check("results match the database", user_count() - before == statuses.count("created"))
+
+        hashes["left"] = None
+        retry = [rows[i] for i, status in enumerate(statuses) if status == "failed"] + rows[:2]
+        statuses = [result["status"] for result in client.post("/api/v1/users/bulk", json=retry).json()]
+        check("retrying the failed rows creates them", statuses == ["created"] * 15 + ["duplicate"] * 2)
+
+        before = user_count()
+        rows = [{"email": f"job{i}@example.com", "password": "pw"} for i in range(45)] + [{"email": "broken"}]
+        response = client.post("/api/v1/users/bulk", json=rows)
+        job = response.json()
+        check(
+            f"large import becomes a job ({response.status_code}, {len(job.get('task_ids', []))} tasks)",
+            response.status_code == 202 and job["queued"] == 45 and len(job["task_ids"]) == 3,
+        )
+        check("rejected rows are answered in the request", [r["status"] for r in job["results"]] == ["invalid"])
+        check("the tasks created every queued row", user_count() - before == 45)
+        rerun = worker.import_users.apply(args=([{"index": 7, "email": "job7@example.com", "password": "pw"}],))
+        check("a redelivered chunk reports duplicates by index", rerun.result == [{
+            "index": 7, "status": "duplicate", "email": "job7@example.com", "id": None,
+            "detail": "Email already registered",
+        }])
+
+    security.get_password_hash_async = real_hash
+    security.get_password_hash = real_sync_hash
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
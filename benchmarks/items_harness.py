@@ -0,0 +1,76 @@
+"""
+benchmarks/items_harness.py
+
+End-to-end checks of item updates through the API on a throwaway SQLite
+database:
+
+- PUT /items/{id} rejects an explicit null or empty title with 422 (the
+  column is NOT NULL) and leaves the item unchanged
+- a partial PUT only touches the fields it sends
+- /items/batch rejects the same null title per operation
+
+Needs httpx (for TestClient):
+    python -m benchmarks.items_harness
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'items.db')}"
+os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+import app.models.item  # noqa: E402,F401
+import app.models.user  # noqa: E402,F401
+from app.db.session import engine  # noqa: E402
+from app.main import app as application  # noqa: E402
+
+failures = []
+
+
+def check(label: str, condition: bool) -> None:
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+def main() -> int:
+    SQLModel.metadata.create_all(engine)
+    with TestClient(application) as client:
+        client.post("/api/v1/users/", json={"email": "owner@example.com", "password": "pw"})
+        client.post("/api/v1/login/access-token", json={"email": "owner@example.com", "password": "pw"})
+        item = client.post("/api/v1/items/", json={"title": "kept", "description": "d"}).json()
+        path = f"/api/v1/items/{item['id']}"
+
+        response = client.put(path, json={"title": None})
+        check(f"null title is rejected with 422 ({response.status_code})", response.status_code == 422)
+        response = client.put(path, json={"title": ""})
+        check(f"empty title is rejected with 422 ({response.status_code})", response.status_code == 422)
+        check("rejected updates leave the item unchanged", client.get(path).json()["title"] == "kept")
+
+        response = client.put(path, json={"description": "new"})
+        check(
+            "partial update only touches the sent fields",
+            response.status_code == 200 and response.json()["title"] == "kept"
+            and response.json()["description"] == "new",
+        )
+
+        response = client.post(
+            "/api/v1/items/batch",
+            json={"operations": [{"op": "update", "id": item["id"], "data": {"title": None}}]},
+        )
+        check(
+            "batch update rejects a null title",
+            response.status_code == 200 and response.json()[0]["status"] == 422,
+        )
+
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
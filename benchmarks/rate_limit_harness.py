@@ -0,0 +1,105 @@
+"""
+benchmarks/rate_limit_harness.py
+
+Exercises app/core/rate_limit.py against an in-memory fake Redis, so the Lua
+token-bucket script runs without a Redis server:
+
+- a bucket allows `capacity` requests, then answers 429 with Retry-After
+- a multi-bucket check spends nothing when any bucket is empty
+- concurrent requests can't overshoot a bucket
+- buckets refill over time
+- an unreachable Redis falls back to in-process buckets
+- the login endpoint is throttled per account across client IPs
+
+Needs fakeredis with Lua support and httpx:
+    pip install "fakeredis[lua]" httpx
+    python -m benchmarks.rate_limit_harness
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'ratelimit.db')}"
+os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
+
+import httpx  # noqa: E402
+import redis.asyncio as redis  # noqa: E402
+from fakeredis import FakeAsyncRedis  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.rate_limit import Limit, RateLimiter, rate_limiter  # noqa: E402
+from app.db.session import async_engine, engine  # noqa: E402
+from app.main import app as application  # noqa: E402
+
+failures = []
+
+
+def check(label: str, condition: bool) -> None:
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+async def allowed(limiter: RateLimiter, *limits: Limit) -> bool:
+    try:
+        await limiter.hit(*limits)
+        return True
+    except HTTPException as exc:
+        assert exc.status_code == 429 and int(exc.headers["Retry-After"]) >= 1
+        return False
+
+
+async def main() -> int:
+    limiter = RateLimiter(FakeAsyncRedis())
+
+    results = [await allowed(limiter, Limit("burst", 5, 60)) for _ in range(7)]
+    check("5 of 7 requests pass a 5/min bucket", results == [True] * 5 + [False] * 2)
+
+    ip, account = Limit("multi:ip", 1, 60), Limit("multi:account", 3, 60)
+    await allowed(limiter, ip, account)
+    await allowed(limiter, ip, account)  # rejected by the ip bucket
+    results = [await allowed(limiter, account) for _ in range(3)]
+    check("a rejected multi-bucket check spends no tokens", results == [True, True, False])
+
+    results = await asyncio.gather(*(allowed(limiter, Limit("race", 10, 60)) for _ in range(100)))
+    check("100 concurrent requests, exactly 10 admitted", sum(results) == 10)
+
+    refill = Limit("refill", 2, 0.2)
+    results = [await allowed(limiter, refill) for _ in range(3)]
+    await asyncio.sleep(0.15)
+    results.append(await allowed(limiter, refill))
+    check("bucket refills over time", results == [True, True, False, True])
+
+    down = RateLimiter(redis.Redis(port=1, socket_connect_timeout=0.1))
+    results = [await allowed(down, Limit("fallback", 2, 60)) for _ in range(3)]
+    check("unreachable Redis falls back to in-process buckets", results == [True, True, False])
+
+    # End to end: wrong passwords for one account from rotating client IPs
+    SQLModel.metadata.create_all(engine)
+    rate_limiter.bind(FakeAsyncRedis())
+    statuses = []
+    for i in range(settings.RATE_LIMIT_LOGIN_PER_ACCOUNT + 2):
+        transport = httpx.ASGITransport(app=application, client=(f"10.0.0.{i}", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://harness") as client:
+            response = await client.post(
+                "/api/v1/login/access-token",
+                json={"email": "victim@example.com", "password": f"guess{i}"},
+            )
+            statuses.append(response.status_code)
+    limit = settings.RATE_LIMIT_LOGIN_PER_ACCOUNT
+    check(
+        f"login throttled per account across IPs: {statuses}",
+        statuses[:limit] == [400] * limit and statuses[limit:] == [429, 429],
+    )
+    await async_engine.dispose()
+
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
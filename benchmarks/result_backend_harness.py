@@ -0,0 +1,76 @@
+"""
+benchmarks/result_backend_harness.py
+
+Checks app/core/result_backend.py against an in-memory fake Redis:
+
+- the app's backend is used even when CELERY_RESULT_BACKEND comes from the
+  environment (Celery reads that variable ahead of its own configuration)
+- results expire after the task's own result_expires, or the global TTL
+- large results are stored compressed and decode back unchanged
+- task_meta reads many task states at once; unknown ids are PENDING
+
+Needs fakeredis:
+    pip install fakeredis
+    python -m benchmarks.result_backend_harness
+"""
+
+import os
+import sys
+
+os.environ["CELERY_RESULT_BACKEND"] = "redis://127.0.0.1:6390/0"
+
+import fakeredis  # noqa: E402
+from celery import states  # noqa: E402
+from celery.app.task import Context  # noqa: E402
+
+from app import worker  # noqa: E402
+from app.core.celery_app import celery_app  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.result_backend import ResultBackend, task_meta  # noqa: E402
+
+failures = []
+
+
+def check(label: str, condition: bool) -> None:
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+def main() -> int:
+    backend = celery_app.backend
+    check(f"env-configured backend is ResultBackend ({type(backend).__name__})", isinstance(backend, ResultBackend))
+    check("backend uses the environment's URL", backend.connparams.get("port") == 6390)
+
+    backend.client = fakeredis.FakeRedis()
+    report = {
+        str(i): {"status": "processed", "result": f"Order {i} Processed Successfully"} for i in range(200)
+    }
+    backend.store_result("batch", report, states.SUCCESS, request=Context(task=worker.process_order_batch.name))
+    backend.store_result("heavy", "Processed: x", states.SUCCESS, request=Context(task=worker.long_running_task.name))
+
+    batch_key = backend.get_key_for_task("batch")
+    heavy_key = backend.get_key_for_task("heavy")
+    check(
+        "per-task result_expires applies",
+        settings.ORDER_BATCH_RESULT_EXPIRES_SECONDS - 5 < backend.client.ttl(batch_key)
+        <= settings.ORDER_BATCH_RESULT_EXPIRES_SECONDS,
+    )
+    check(
+        "global result TTL applies otherwise",
+        settings.CELERY_RESULT_EXPIRES_SECONDS - 5 < backend.client.ttl(heavy_key)
+        <= settings.CELERY_RESULT_EXPIRES_SECONDS,
+    )
+    check("large result is stored compressed", backend.client.get(batch_key).startswith(b"zlib:"))
+    check("small result is stored as plain JSON", backend.client.get(heavy_key).startswith(b"{"))
+    check("compressed result decodes unchanged", backend.get_task_meta("batch")["result"] == report)
+
+    statuses = [meta["status"] for meta in task_meta(backend, ["heavy", "batch", "unknown"])]
+    check(f"task_meta reads states in order: {statuses}", statuses == ["SUCCESS", "SUCCESS", "PENDING"])
+
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
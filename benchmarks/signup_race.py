@@ -0,0 +1,70 @@
+"""
+benchmarks/signup_race.py
+
+Fires concurrent signups at POST /users/ against an empty database and checks
+that exactly one of them became a superuser, then times signups once the
+first-user flag is cached.
+
+Uses a throwaway SQLite file by default (needs aiosqlite and httpx). Set
+BENCH_DATABASE_URI to an empty Postgres database to exercise the advisory lock:
+    BENCH_DATABASE_URI=postgresql://postgres:@localhost:5432/race_db \\
+        python -m benchmarks.signup_race
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+SIGNUPS = 50
+
+if "BENCH_DATABASE_URI" in os.environ:
+    os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCH_DATABASE_URI"]
+else:
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'race.db')}"
+os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
+# Every signup comes from the same client address
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from sqlmodel import Session, SQLModel, select  # noqa: E402
+
+from app.db.session import async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+async def signup(client: httpx.AsyncClient, i: int, prefix: str) -> int:
+    response = await client.post(
+        "/api/v1/users/", json={"email": f"{prefix}{i}@example.com", "password": "secret"}
+    )
+    return response.status_code
+
+
+async def main() -> int:
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://race") as client:
+        statuses = await asyncio.gather(*(signup(client, i, "race") for i in range(SIGNUPS)))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(signup(client, i, "warm") for i in range(SIGNUPS)))
+        warm_elapsed = time.perf_counter() - start
+
+    with Session(engine) as db:
+        superusers = db.exec(select(User).where(User.is_superuser == True)).all()  # noqa: E712
+    await async_engine.dispose()
+
+    failed = [s for s in statuses if s != 200]
+    print(f"{SIGNUPS} concurrent signups on an empty database: {len(failed)} failed, {len(superusers)} superuser(s)")
+    print(f"{SIGNUPS} signups after bootstrap: {warm_elapsed:.2f}s (argon2-bound)")
+    ok = len(superusers) == 1 and not failed
+    print("OK" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,4 +1,12 @@
 #!/bin/bash
-echo "Starting Celery Worker..."
+# Usage: ./run_worker.sh [io|cpu]
+# With a profile the worker consumes only that queue with matching tuning;
+# without one it consumes both queues with Celery's defaults.
+PROFILE=${1:-}
+echo "Starting Celery Worker... ${PROFILE:+(profile: $PROFILE)}"
 # Note: Removed --pool=solo which is typically for Windows. Default prefork is better on Mac/Linux.
-./venv/bin/celery -A app.core.celery_app worker --loglevel=info
+if [ -n "$PROFILE" ]; then
+    CELERY_WORKER_PROFILE=$PROFILE ./venv/bin/celery -A app.core.celery_app worker --loglevel=info -n "$PROFILE@%h"
+else
+    ./venv/bin/celery -A app.core.celery_app worker --loglevel=info -Q io,cpu
+fi